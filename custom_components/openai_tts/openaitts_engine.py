@@ -13,13 +13,29 @@ from .const import KOKORO_MODEL # To identify Kokoro engine for chunk_size
 _LOGGER = logging.getLogger(__name__)
 
 class OpenAITTSEngine:
-    def __init__(self, api_key: str, voice: str, model: str, speed: float, url: str, chunk_size: int | None = None):
+    def __init__(
+        self,
+        api_key: str,
+        voice: str,
+        model: str,
+        speed: float,
+        url: str,
+        chunk_size: int | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ):
         self._api_key = api_key
         self._voice = voice
         self._model = model
         self._speed = speed
         self._url = url
-        self._session = aiohttp.ClientSession()
+        # One long-lived session so consecutive requests reuse pooled keep-alive
+        # connections instead of paying a TCP/TLS handshake each time. Home Assistant's
+        # shared session is passed in so all entries share one connection pool; a
+        # private session is only created (and closed) when none is given.
+        self._owns_session = session is None
+        self._session = session or aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(keepalive_timeout=60, ttl_dns_cache=300)
+        )
         self._chunk_size = chunk_size # Store chunk_size
 
     async def get_tts(self, text: str, speed: float = None, instructions: str = None, voice: str = None):
@@ -92,8 +108,8 @@ class OpenAITTSEngine:
             raise HomeAssistantError("An unknown error occurred while fetching TTS audio") from exc
 
     async def close(self):
-        """Close the aiohttp session."""
-        if self._session and not self._session.closed:
+        """Close the aiohttp session, unless it is shared and owned by someone else."""
+        if self._owns_session and self._session and not self._session.closed:
             await self._session.close()
 
     @staticmethod
@@ -233,6 +233,18 @@ class TestOpenAITTSEngine(unittest.IsolatedAsyncioTestCase):
              await engine._session.close()
 
 
+    async def test_close_keeps_shared_session_open(self):
+        """Test that close leaves a session passed in by the caller open."""
+        shared_session = MagicMock(spec=aiohttp.ClientSession)
+        shared_session.closed = False
+        engine = OpenAITTSEngine(
+            self.api_key, self.openai_voice, self.openai_model, self.openai_speed, self.openai_url,
+            session=shared_session,
+        )
+        self.assertIs(engine._session, shared_session)
+        await engine.close()
+        shared_session.close.assert_not_called()
+
     @patch("aiohttp.ClientSession")
     async def test_close_method(self, MockClientSession):
         """Test that the close method correctly closes the aiohttp session."""
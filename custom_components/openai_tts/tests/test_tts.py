@@ -1,13 +1,15 @@
 import asyncio
+import os
+import tempfile
 import unittest
 from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.exceptions import HomeAssistantError
+from homeassistant.exceptions import HomeAssistantError, MaxLengthExceeded
 
 # Adjust import paths as necessary
-from custom_components.openai_tts.tts import OpenAITTSEntity, async_setup_entry
+from custom_components.openai_tts.tts import KokoroOpenAITTSEntity, async_setup_entry
 from custom_components.openai_tts.openaitts_engine import OpenAITTSEngine
 from custom_components.openai_tts.const import (
     DOMAIN,
@@ -30,8 +32,8 @@ from custom_components.openai_tts.const import (
 )
 from homeassistant.components import media_source # Added
 import hashlib # Added
-from urllib.parse import quote # Added
 from custom_components.openai_tts.tts import STREAMING_VIEW_URL # Added
+from custom_components.openai_tts.tts import _CHIME_CACHE, _Settings, _StreamAudioCache, _async_run_ffmpeg, _loudnorm_gain, _stream_hash, TTSAudioRequest
 
 
 # Minimal HomeAssistant mock
@@ -42,6 +44,12 @@ class MockHomeAssistant(MagicMock):
         # Mock async_add_executor_job to run functions directly for simplicity in these tests
         # For more complex scenarios, you might need a proper event loop and executor.
         self.async_add_executor_job = AsyncMock(side_effect=lambda func, *args: func(*args))
+        # Keep files written by the integration (e.g. the stream cache) in a temp folder
+        config = MagicMock()
+        config.path.side_effect = lambda *parts: os.path.join(tempfile.gettempdir(), "openai_tts_test", *parts)
+        self.config = config
+        # Run background tasks (e.g. the shared stream producer) on the test event loop
+        self.async_create_background_task = MagicMock(side_effect=lambda target, name, eager_start=True: asyncio.ensure_future(target))
 
 
 class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
@@ -70,9 +78,13 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         self.mock_engine = AsyncMock(spec=OpenAITTSEngine)
         # Default title for config entry, can be overridden in tests
         self.config_entry_title = "Test TTS Config"
+        # Keep chimes from being encoded with a real FFmpeg when options change
+        chime_cache_patcher = patch.dict(_CHIME_CACHE, {"threetone.mp3": b"cached_chime"})
+        chime_cache_patcher.start()
+        self.addCleanup(chime_cache_patcher.stop)
 
 
-    def _setup_entity(self, config_data: dict) -> OpenAITTSEntity:
+    def _setup_entity(self, config_data: dict) -> KokoroOpenAITTSEntity:
         """Helper to create an entity instance with mocked ConfigEntry and engine."""
         mock_config_entry = MagicMock(spec=ConfigEntry)
         mock_config_entry.data = config_data
@@ -85,7 +97,7 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         # For now, let's assume we pass the engine in if testing entity methods directly.
         # If testing async_setup_entry, we'd patch the engine's constructor.
 
-        entity = OpenAITTSEntity(self.hass, mock_config_entry, self.mock_engine)
+        entity = KokoroOpenAITTSEntity(self.hass, mock_config_entry, self.mock_engine)
         return entity
 
     async def test_device_info_openai(self):
@@ -104,7 +116,7 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         entity = self._setup_entity(self.kokoro_config_data)
         device_info = entity.device_info
         self.assertEqual(device_info["manufacturer"], "Kokoro FastAPI")
-        self.assertEqual(device_info["model"], KOKORO_MODEL) # Check against constant
+        self.assertEqual(device_info["model"], f"Kokoro ({KOKORO_MODEL})") # Check against constant
         self.assertEqual(device_info["name"], self.config_entry_title)
 
     async def test_name_property_openai(self):
@@ -113,6 +125,18 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         entity = self._setup_entity(self.openai_config_data)
         self.assertEqual(entity.name, self.config_entry_title)
 
+    async def test_name_property_refreshed_on_update(self):
+        """Test that the cached name follows a changed config entry title."""
+        self.config_entry_title = "OpenAI TTS tts-1"
+        entity = self._setup_entity(self.openai_config_data)
+        self.assertEqual(entity.name, "OpenAI TTS tts-1")
+
+        type(entity._config).title = PropertyMock(return_value="Kitchen TTS")
+        self.assertEqual(entity.name, "OpenAI TTS tts-1") # Cached until the entry is updated
+        await entity._async_update_options(self.hass, entity._config)
+        self.assertEqual(entity.name, "Kitchen TTS")
+        self.assertEqual(entity.device_info["name"], "Kitchen TTS")
+
     async def test_name_property_kokoro(self):
         """Test name property for Kokoro FastAPI configuration."""
         self.config_entry_title = f"Kokoro FastAPI TTS {KOKORO_MODEL}"
@@ -127,10 +151,12 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         entity = self._setup_entity(kokoro_config_with_options)
         # Simulate that the blended voice is set in options by the user
         entity._config.options = {CONF_VOICE: blended_voice_str}
+        await entity._async_update_options(self.hass, entity._config)
 
         test_audio_chunks = [b"Blended", b" ", b"Audio"]
+        received_voices = []
         async def mock_stream_audio(text, voice, **kwargs): # Capture voice arg
-            self.assertEqual(voice, blended_voice_str) # Assert blended voice is passed
+            received_voices.append(voice)
             for chunk in test_audio_chunks:
                 yield chunk
         self.mock_engine.get_tts = mock_stream_audio
@@ -139,14 +165,19 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(fmt, "mp3")
         self.assertEqual(audio_data, b"Blended Audio")
-        self.mock_engine.get_tts.assert_called_once() # More detailed args check in mock_stream_audio
+        self.assertEqual(received_voices, [blended_voice_str]) # Called once, with the blended voice
 
 
-    @patch("subprocess.run")
-    async def test_async_get_tts_audio_with_ffmpeg_processing(self, mock_subprocess_run):
+    @patch("asyncio.create_subprocess_exec")
+    async def test_async_get_tts_audio_with_ffmpeg_processing(self, mock_create_subprocess_exec):
         """Test audio streaming with ffmpeg (chime/normalization) correctly called."""
-        # Setup mock for subprocess.run
-        mock_subprocess_run.return_value = MagicMock(returncode=0, stdout=b"", stderr=b"")
+        # Setup mock ffmpeg process, the processed audio comes back on stdout
+        mock_process = MagicMock(returncode=0)
+        mock_process.stdin.drain = AsyncMock()
+        mock_process.stdout.read = AsyncMock(return_value=b"processed_audio")
+        mock_process.stderr.read = AsyncMock(return_value=b"")
+        mock_process.wait = AsyncMock(return_value=0)
+        mock_create_subprocess_exec.return_value = mock_process
 
         # Enable chime to trigger ffmpeg processing
         entity = self._setup_entity(self.kokoro_config_data)
@@ -155,58 +186,299 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
             "chime_sound": "threetone.mp3",
             "normalize_audio": True
         }
+        await entity._async_update_options(self.hass, entity._config)
 
         test_audio_chunks = [b"raw_audio_chunk1", b"raw_audio_chunk2"]
-        expected_raw_audio = b"raw_audio_chunk1raw_audio_chunk2"
 
         async def mock_stream_audio(*args, **kwargs):
             for chunk in test_audio_chunks:
                 yield chunk
         self.mock_engine.get_tts = mock_stream_audio
 
-        # Mock tempfile operations
-        mock_temp_file_tts = MagicMock()
-        mock_temp_file_tts.name = "/tmp/fake_tts.mp3"
-        mock_temp_file_tts.__enter__.return_value = mock_temp_file_tts # For 'with' statement
+        with patch.dict(_CHIME_CACHE, {"threetone.mp3": b"cached_chime"}), \
+             patch("tempfile.NamedTemporaryFile") as mock_tempfile_creator:
+
+            fmt, audio_data = await entity.async_get_tts_audio("Test message", "en-US", options={})
+
+            self.assertEqual(fmt, "mp3")
+            # Cached chime frames are prepended to the audio coming from ffmpeg stdout
+            self.assertEqual(audio_data, b"cached_chimeprocessed_audio")
+
+            # TTS audio is piped to ffmpeg, no temp files are created
+            mock_tempfile_creator.assert_not_called()
+
+            # ffmpeg runs as an asyncio subprocess, not in the executor
+            self.hass.async_add_executor_job.assert_not_called()
+            # Only the TTS audio goes through ffmpeg, the chime is not decoded again
+            mock_create_subprocess_exec.assert_called_once()
+            ffmpeg_cmd = mock_create_subprocess_exec.call_args[0]
+            self.assertEqual(ffmpeg_cmd[0], "ffmpeg")
+            self.assertIn("pipe:0", ffmpeg_cmd)
+            self.assertFalse(any("threetone" in arg for arg in ffmpeg_cmd))
+            self.assertEqual(ffmpeg_cmd[-1], "pipe:1")
+            # Chunks are fed to ffmpeg as they arrive from the engine
+            self.assertEqual(
+                [call.args[0] for call in mock_process.stdin.write.call_args_list], test_audio_chunks
+            )
+            mock_process.stdin.close.assert_called_once()
+
 
-        mock_temp_file_merged = MagicMock()
-        mock_temp_file_merged.name = "/tmp/fake_merged.mp3"
-        mock_temp_file_merged.__enter__.return_value = mock_temp_file_merged
+    @patch("asyncio.create_subprocess_exec")
+    async def test_async_get_tts_audio_normalize_reuses_measured_gain(self, mock_create_subprocess_exec):
+        """Test that loudnorm only runs until a gain was measured, which is then applied directly."""
+        mock_process = MagicMock(returncode=0)
+        mock_process.stdin.drain = AsyncMock()
+        mock_process.stdout.read = AsyncMock(return_value=b"normalized_audio")
+        mock_process.stderr.read = AsyncMock(return_value=b'[Parsed_loudnorm_0] {"input_i" : "-20.50"}')
+        mock_process.wait = AsyncMock(return_value=0)
+        mock_create_subprocess_exec.return_value = mock_process
 
-        # Patch tempfile.NamedTemporaryFile and open
-        with patch("tempfile.NamedTemporaryFile", side_effect=[mock_temp_file_tts, mock_temp_file_merged]) as mock_tempfile_creator, \
-             patch("builtins.open", MagicMock(return_value=MagicMock(read=MagicMock(return_value=b"processed_audio")))) as mock_open, \
-             patch("os.path.join", MagicMock(return_value="/mock/path/to/chime.mp3")), \
-             patch("os.path.dirname", MagicMock(return_value="/mock/path")), \
-             patch("os.remove") as mock_os_remove:
+        entity = self._setup_entity(self.kokoro_config_data)
+        entity._config.options = {"normalize_audio": True}
+        await entity._async_update_options(self.hass, entity._config)
 
+        async def mock_stream_audio(*args, **kwargs):
+            yield b"raw_audio"
+        self.mock_engine.get_tts = mock_stream_audio
+
+        for _ in range(2):
             fmt, audio_data = await entity.async_get_tts_audio("Test message", "en-US", options={})
+            self.assertEqual(audio_data, b"normalized_audio")
+
+        first_cmd = mock_create_subprocess_exec.call_args_list[0][0]
+        second_cmd = mock_create_subprocess_exec.call_args_list[1][0]
+        self.assertTrue(any(arg.startswith("loudnorm=") for arg in first_cmd))
+        self.assertIn("volume=4.50dB,alimiter=limit=0.891:level=disabled", second_cmd)
+        self.assertEqual(entity._normalize_gains, {"af_alloy": 4.5})
+
+        # Another voice is measured on its own; the first voice keeps its gain
+        entity._config.options = {"normalize_audio": True, CONF_VOICE: "af_nova"}
+        await entity._async_update_options(self.hass, entity._config)
+        await entity.async_get_tts_audio("Test message", "en-US", options={})
+        third_cmd = mock_create_subprocess_exec.call_args_list[2][0]
+        self.assertTrue(any(arg.startswith("loudnorm=") for arg in third_cmd))
+        self.assertEqual(entity._normalize_gains, {"af_alloy": 4.5, "af_nova": 4.5})
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_async_get_tts_audio_normalize_gain_follows_measured_voice(self, mock_create_subprocess_exec):
+        """Test that a measurement finishing after a voice change is kept for the old voice."""
+        voice_changed = asyncio.Event()
+
+        async def read_log():
+            await voice_changed.wait()
+            return b'[Parsed_loudnorm_0] {"input_i" : "-20.50"}'
+
+        mock_process = MagicMock(returncode=0)
+        mock_process.stdin.drain = AsyncMock()
+        mock_process.stdout.read = AsyncMock(return_value=b"normalized_audio")
+        mock_process.stderr.read = read_log
+        mock_process.wait = AsyncMock(return_value=0)
+        mock_create_subprocess_exec.return_value = mock_process
 
-            self.assertEqual(fmt, "mp3")
-            self.assertEqual(audio_data, b"processed_audio") # Audio comes from mocked open after ffmpeg
+        entity = self._setup_entity(self.kokoro_config_data)
+        entity._config.options = {"normalize_audio": True}
+        await entity._async_update_options(self.hass, entity._config)
+
+        async def mock_stream_audio(*args, **kwargs):
+            yield b"raw_audio"
+        self.mock_engine.get_tts = mock_stream_audio
+
+        request = asyncio.ensure_future(entity.async_get_tts_audio("Test message", "en-US", options={}))
+        await asyncio.sleep(0.01)
+        entity._config.options = {"normalize_audio": True, CONF_VOICE: "af_nova"}
+        await entity._async_update_options(self.hass, entity._config)
+        voice_changed.set()
+        await request
+
+        self.assertEqual(entity._normalize_gains, {"af_alloy": 4.5})
+
+    async def test_loudnorm_gain_ignores_near_silent_measurements(self):
+        """Test that a gain is only taken from measurements of audible audio."""
+        self.assertEqual(_loudnorm_gain(b'{"input_i" : "-20.50"}'), 4.5)
+        self.assertIsNone(_loudnorm_gain(b'{"input_i" : "-60.00"}'))
+        self.assertIsNone(_loudnorm_gain(b'{"input_i" : "-inf"}'))
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_async_get_tts_audio_chime_only_skips_ffmpeg(self, mock_create_subprocess_exec):
+        """Test that a chime is joined to matching MP3 audio without running ffmpeg."""
+        entity = self._setup_entity(self.kokoro_config_data)
+        entity._config.options = {"chime": True, "chime_sound": "threetone"}
+        await entity._async_update_options(self.hass, entity._config)
+
+        # MPEG-2 Layer III frame header: 24 kHz, mono
+        tts_audio = b"\xff\xf3\x94\xc4" + b"\x00" * 100
+        async def mock_stream_audio(*args, **kwargs):
+            yield tts_audio
+        self.mock_engine.get_tts = mock_stream_audio
+
+        fmt, audio_data = await entity.async_get_tts_audio("Test message", "en-US", options={})
+
+        self.assertEqual(fmt, "mp3")
+        self.assertEqual(audio_data, b"cached_chime" + tts_audio)
+        mock_create_subprocess_exec.assert_not_called()
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_ffmpeg_processes_are_bounded(self, mock_create_subprocess_exec):
+        """Test that concurrent requests don't run more FFmpeg processes than allowed."""
+        running = 0
+        max_running = 0
+
+        async def communicate(input=None):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return b"processed_audio", b""
+
+        mock_process = MagicMock(returncode=0)
+        mock_process.communicate = communicate
+        mock_create_subprocess_exec.return_value = mock_process
+
+        with patch("custom_components.openai_tts.tts._FFMPEG_SEMAPHORE", asyncio.Semaphore(1)):
+            results = await asyncio.gather(
+                *(_async_run_ffmpeg(["-f", "mp3", "-i", "pipe:0"], b"raw_audio") for _ in range(3))
+            )
+
+        self.assertEqual(results, [b"processed_audio"] * 3)
+        self.assertEqual(max_running, 1)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_ffmpeg_downloads_before_waiting_for_a_slot(self, mock_create_subprocess_exec):
+        """Test that streamed input is read completely while all FFmpeg slots are taken."""
+        mock_process = MagicMock(returncode=0)
+        mock_process.communicate = AsyncMock(return_value=(b"processed_audio", b""))
+        mock_create_subprocess_exec.return_value = mock_process
+        downloaded = asyncio.Event()
+
+        async def audio_chunks():
+            yield b"raw_"
+            yield b"audio"
+            downloaded.set()
+
+        semaphore = asyncio.Semaphore(1)
+        with patch("custom_components.openai_tts.tts._FFMPEG_SEMAPHORE", semaphore):
+            await semaphore.acquire()
+            run = asyncio.ensure_future(_async_run_ffmpeg(["-f", "mp3", "-i", "pipe:0"], audio_chunks()))
+            await asyncio.wait_for(downloaded.wait(), 1)
+            mock_create_subprocess_exec.assert_not_called()
+            semaphore.release()
+            self.assertEqual(await run, b"processed_audio")
+
+        mock_process.communicate.assert_called_once_with(input=b"raw_audio")
+
+    @unittest.skipIf(TTSAudioRequest is None, "Streaming TTS needs a newer Home Assistant")
+    async def test_async_stream_tts_audio_yields_engine_chunks(self):
+        """Test that streamed TTS passes engine chunks through without buffering."""
+        entity = self._setup_entity(self.openai_config_data)
+        test_audio_chunks = [b"chunk1", b"chunk2"]
+        received_text = []
+
+        async def mock_stream_audio(*args, **kwargs):
+            received_text.append(kwargs["text"])
+            for chunk in test_audio_chunks:
+                yield chunk
+        self.mock_engine.get_tts = mock_stream_audio
+
+        async def message_gen():
+            yield "Hello "
+            yield "world"
+
+        response = await entity.async_stream_tts_audio(
+            TTSAudioRequest(language="en-US", options={}, message_gen=message_gen())
+        )
+
+        self.assertEqual(response.extension, "mp3")
+        self.assertEqual([chunk async for chunk in response.data_gen], test_audio_chunks)
+        self.assertEqual(received_text, ["Hello world"])
+
+    @unittest.skipIf(TTSAudioRequest is None, "Streaming TTS needs a newer Home Assistant")
+    async def test_async_stream_tts_audio_no_audio(self):
+        """Test that an empty upstream response fails the stream instead of ending it silently."""
+        entity = self._setup_entity(self.openai_config_data)
+
+        async def mock_stream_audio(*args, **kwargs):
+            return
+            yield
+        self.mock_engine.get_tts = mock_stream_audio
+
+        async def message_gen():
+            yield "Hello world"
+
+        response = await entity.async_stream_tts_audio(
+            TTSAudioRequest(language="en-US", options={}, message_gen=message_gen())
+        )
+        with self.assertRaises(HomeAssistantError):
+            [chunk async for chunk in response.data_gen]
+
+    @unittest.skipIf(TTSAudioRequest is None, "Streaming TTS needs a newer Home Assistant")
+    async def test_async_stream_tts_audio_message_too_long(self):
+        """Test that the length limit applies before any synthesis starts."""
+        entity = self._setup_entity(self.openai_config_data)
+
+        async def message_gen():
+            yield "a" * 4097
+
+        response = await entity.async_stream_tts_audio(
+            TTSAudioRequest(language="en-US", options={}, message_gen=message_gen())
+        )
+        with self.assertRaises(MaxLengthExceeded):
+            [chunk async for chunk in response.data_gen]
+        self.mock_engine.get_tts.assert_not_called()
+
+    @unittest.skipIf(TTSAudioRequest is None, "Streaming TTS needs a newer Home Assistant")
+    async def test_async_stream_tts_audio_cancelled_on_removal(self):
+        """Test that removing the entity stops a streamed download."""
+        entity = self._setup_entity(self.openai_config_data)
+        self.mock_engine.close = AsyncMock()
+
+        async def mock_stream_audio(*args, **kwargs):
+            yield b"chunk1"
+            await asyncio.Event().wait() # Never finishes on its own
+        self.mock_engine.get_tts = mock_stream_audio
 
-            # Check that tempfile.NamedTemporaryFile was called to create tts and merged files
-            self.assertEqual(mock_tempfile_creator.call_count, 2)
+        async def message_gen():
+            yield "Hello world"
 
-            # Check that tts_file.write was called with the concatenated raw audio
-            mock_temp_file_tts.write.assert_called_once_with(expected_raw_audio)
+        response = await entity.async_stream_tts_audio(
+            TTSAudioRequest(language="en-US", options={}, message_gen=message_gen())
+        )
+        data_gen = aiter(response.data_gen)
+        self.assertEqual(await anext(data_gen), b"chunk1")
+        self.assertEqual(len(entity._inflight_tasks), 1)
+
+        await entity.async_will_remove_from_hass()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await anext(data_gen)
+        self.assertFalse(entity._inflight_tasks)
+
+    @patch("asyncio.create_subprocess_exec")
+    async def test_async_get_tts_audio_rejects_chime_outside_chime_folder(self, mock_create_subprocess_exec):
+        """Test that a chime name pointing outside the chime folder is skipped."""
+        entity = self._setup_entity(self.kokoro_config_data)
+        async def mock_stream_audio(*args, **kwargs):
+            yield b"raw_audio"
+        self.mock_engine.get_tts = mock_stream_audio
 
-            # Check that hass.async_add_executor_job was used for subprocess.run
-            self.hass.async_add_executor_job.assert_called()
-            # Check that subprocess.run was called (args depend on chime/norm options)
-            mock_subprocess_run.assert_called()
-            # Check that temp files were removed
-            self.assertGreaterEqual(mock_os_remove.call_count, 2)
+        fmt, audio_data = await entity.async_get_tts_audio(
+            "Test message", "en-US", options={"chime": True, "chime_sound": "../../secrets.mp3"}
+        )
 
+        self.assertEqual(audio_data, b"raw_audio")
+        mock_create_subprocess_exec.assert_not_called()
 
     async def test_async_get_tts_audio_engine_error(self):
         """Test error handling when the TTS engine's get_tts fails."""
         entity = self._setup_entity(self.openai_config_data)
-        self.mock_engine.get_tts = AsyncMock(side_effect=HomeAssistantError("Engine failed"))
+        async def mock_stream_audio(*args, **kwargs):
+            raise HomeAssistantError("Engine failed")
+            yield
+        self.mock_engine.get_tts = mock_stream_audio
 
         fmt, audio_data = await entity.async_get_tts_audio("Test error", "en-US", options={})
 
-        self.assertIsNone(fmt)
+        self.assertEqual(fmt, "mp3") # Errors are reported as ("mp3", None)
         self.assertIsNone(audio_data)
         # Add log check if possible/needed: _LOGGER.exception("Unknown error in get_tts_audio")
 
@@ -218,9 +490,56 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         await entity.async_will_remove_from_hass()
         self.mock_engine.close.assert_called_once()
 
+    async def test_async_get_tts_audio_cancelled_caller_cancels_download(self):
+        """Test that cancelling a request also cancels its download."""
+        entity = self._setup_entity(self.openai_config_data)
+        started = asyncio.Event()
+
+        async def mock_stream_audio(*args, **kwargs):
+            yield b"chunk"
+            started.set()
+            await asyncio.Event().wait() # Never finishes on its own
+
+        self.mock_engine.get_tts = mock_stream_audio
+
+        request = asyncio.ensure_future(entity.async_get_tts_audio("Test message", "en-US", options={}))
+        await started.wait()
+        download = next(iter(entity._inflight_tasks))
+        request.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await request
+        await asyncio.sleep(0)
+        self.assertTrue(download.cancelled())
+
+    async def test_async_will_remove_from_hass_cancels_inflight_requests(self):
+        """Test that removing the entity cancels downloads still in progress."""
+        entity = self._setup_entity(self.openai_config_data)
+        self.mock_engine.close = AsyncMock()
+        started = asyncio.Event()
+
+        async def mock_stream_audio(*args, **kwargs):
+            yield b"chunk"
+            started.set()
+            await asyncio.Event().wait() # Never finishes on its own
+
+        self.mock_engine.get_tts = mock_stream_audio
+
+        request = asyncio.ensure_future(entity.async_get_tts_audio("Test message", "en-US", options={}))
+        await started.wait()
+        await entity.async_will_remove_from_hass()
+
+        # The download ran in a task of the entity's own, which was cancelled; the
+        # caller itself wasn't, so it gets the usual error result
+        self.hass.async_create_background_task.assert_called_once()
+        self.assertEqual(await request, ("mp3", None))
+        self.assertFalse(entity._inflight_tasks)
+        self.mock_engine.close.assert_called_once()
+
+    @patch('custom_components.openai_tts.tts.async_call_later') # Mock pending message expiry timer
     @patch('custom_components.openai_tts.tts.get_url') # Mock get_url
     @patch('custom_components.openai_tts.tts._LOGGER') # Mock logger
-    async def test_async_get_tts_audio_media_source_requested(self, mock_logger, mock_get_url):
+    async def test_async_get_tts_audio_media_source_requested(self, mock_logger, mock_get_url, mock_call_later):
         """Test get_tts_audio returns PlayMedia when media_source option is true."""
         mock_get_url.return_value = "http://hass_base_url" # Mock base URL
 
@@ -240,25 +559,60 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(result, media_source.PlayMedia)
         self.assertEqual(result.mime_type, "audio/mpeg")
 
-        message_hash = hashlib.sha256(message.encode("utf-8")).hexdigest()[:16]
+        settings = entity._settings
+        hashed = (
+            f"{settings.model}\n{settings.url}\n{settings.voice}\n{settings.speed}\n{settings.instructions}\n{message}"
+        )
+        message_hash = hashlib.blake2b(hashed.encode("utf-8"), digest_size=8).hexdigest()
         expected_path = STREAMING_VIEW_URL.format(entity_id=entity.entity_id, message_hash=message_hash)
-        expected_url = f"http://hass_base_url{expected_path}?message={quote(message)}"
+        expected_url = f"http://hass_base_url{expected_path}" # The message itself is not part of the URL
         self.assertEqual(result.url, expected_url)
+        # The message is handed to the streaming view by hash instead
+        self.assertEqual(entity.get_pending_message(message_hash), message)
+        mock_call_later.assert_called_once()
 
         # Test warning log if chime or normalization is enabled
         entity._config.options = {CONF_CHIME_ENABLE: True}
+        await entity._async_update_options(self.hass, entity._config)
         await entity.async_get_tts_audio(message, "en-US", options=options)
         mock_logger.warning.assert_called_with(
-            "Chime and/or normalization are enabled but will be bypassed for media_source streaming."
+            "Chime and/or normalization are enabled but will be BYPASSED for media_source streaming."
         )
         mock_logger.reset_mock() # Reset for next assertion
 
         entity._config.options = {CONF_NORMALIZE_AUDIO: True}
+        await entity._async_update_options(self.hass, entity._config)
         await entity.async_get_tts_audio(message, "en-US", options=options)
         mock_logger.warning.assert_called_with(
-            "Chime and/or normalization are enabled but will be bypassed for media_source streaming."
+            "Chime and/or normalization are enabled but will be BYPASSED for media_source streaming."
         )
 
+    @patch('custom_components.openai_tts.tts.async_call_later')
+    @patch('custom_components.openai_tts.tts.get_url', return_value="http://hass_base_url")
+    async def test_async_get_tts_audio_media_source_pending_messages_bounded(self, mock_get_url, mock_call_later):
+        """Test that only the most recent pending messages are kept."""
+        entity = self._setup_entity(self.openai_config_data)
+        entity.entity_id = "tts.test_openai_tts_entity"
+        options = {media_source.TTS_SPEAK_OPTIONS_KEY_MEDIA_SOURCE_ID: True}
+
+        with patch('custom_components.openai_tts.tts.PENDING_MESSAGE_MAX_ENTRIES', 2):
+            for message in ("first", "second", "third"):
+                await entity.async_get_tts_audio(message, "en-US", options=options)
+
+        self.assertEqual(
+            [entry[0] for entry in entity._pending_messages.values()], ["second", "third"]
+        )
+
+    async def test_async_get_tts_audio_media_source_message_too_long(self):
+        """Test that the length limit also applies to streamed messages."""
+        entity = self._setup_entity(self.openai_config_data)
+        options = {media_source.TTS_SPEAK_OPTIONS_KEY_MEDIA_SOURCE_ID: True}
+
+        result = await entity.async_get_tts_audio("a" * 4097, "en-US", options=options)
+
+        self.assertEqual(result, ("mp3", None))
+        self.assertEqual(entity._pending_messages, {})
+
     async def test_async_get_tts_audio_fallback_to_bytes(self):
         """Test get_tts_audio falls back to returning bytes when media_source is not requested."""
         entity = self._setup_entity(self.openai_config_data)
@@ -282,8 +636,10 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(audio_data_absent, b"Hello World")
 
 
+    @patch('custom_components.openai_tts.tts.async_get_clientsession')
+    @patch('custom_components.openai_tts.tts._async_preload_chimes', new_callable=AsyncMock)
     @patch('custom_components.openai_tts.tts.OpenAITTSEngine')
-    async def test_async_setup_entry_kokoro_with_chunk_size_option(self, MockOpenAITTSEngineConstructor):
+    async def test_async_setup_entry_kokoro_with_chunk_size_option(self, MockOpenAITTSEngineConstructor, mock_preload_chimes, mock_get_clientsession):
         """Test async_setup_entry for Kokoro with chunk_size in options."""
         mock_engine_instance = MockOpenAITTSEngineConstructor.return_value
         self.hass.data[DOMAIN] = {}
@@ -305,12 +661,15 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
             model=KOKORO_MODEL, # Ensure it uses the fixed KOKORO_MODEL
             speed=kokoro_config_with_options[CONF_SPEED],
             url=kokoro_config_with_options[CONF_KOKORO_URL],
-            chunk_size=test_chunk_size # Verify chunk_size is passed
+            chunk_size=test_chunk_size, # Verify chunk_size is passed
+            session=mock_get_clientsession.return_value,
         )
         async_add_entities_mock.assert_called_once()
 
+    @patch('custom_components.openai_tts.tts.async_get_clientsession')
+    @patch('custom_components.openai_tts.tts._async_preload_chimes', new_callable=AsyncMock)
     @patch('custom_components.openai_tts.tts.OpenAITTSEngine')
-    async def test_async_setup_entry_kokoro_default_chunk_size(self, MockOpenAITTSEngineConstructor):
+    async def test_async_setup_entry_kokoro_default_chunk_size(self, MockOpenAITTSEngineConstructor, mock_preload_chimes, mock_get_clientsession):
         """Test async_setup_entry for Kokoro with default chunk_size (from const)."""
         mock_engine_instance = MockOpenAITTSEngineConstructor.return_value
         self.hass.data[DOMAIN] = {}
@@ -330,13 +689,16 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
             model=KOKORO_MODEL,
             speed=self.kokoro_config_data[CONF_SPEED],
             url=self.kokoro_config_data[CONF_KOKORO_URL],
-            chunk_size=DEFAULT_KOKORO_CHUNK_SIZE # Verify default chunk_size
+            chunk_size=DEFAULT_KOKORO_CHUNK_SIZE, # Verify default chunk_size
+            session=mock_get_clientsession.return_value,
         )
         async_add_entities_mock.assert_called_once()
 
 
+    @patch('custom_components.openai_tts.tts.async_get_clientsession')
+    @patch('custom_components.openai_tts.tts._async_preload_chimes', new_callable=AsyncMock)
     @patch('custom_components.openai_tts.tts.OpenAITTSEngine')
-    async def test_async_setup_entry_openai_no_chunk_size(self, MockOpenAITTSEngineConstructor):
+    async def test_async_setup_entry_openai_no_chunk_size(self, MockOpenAITTSEngineConstructor, mock_preload_chimes, mock_get_clientsession):
         """Test async_setup_entry for OpenAI configuration."""
         mock_engine_instance = MockOpenAITTSEngineConstructor.return_value
         self.hass.data[DOMAIN] = {}
@@ -354,9 +716,33 @@ class TestOpenAITTSEntity(unittest.IsolatedAsyncioTestCase):
             voice=self.openai_config_data[CONF_VOICE],
             model=self.openai_config_data[CONF_MODEL],
             speed=self.openai_config_data[CONF_SPEED],
-            url=self.openai_config_data[CONF_URL]
+            url=self.openai_config_data[CONF_URL],
+            chunk_size=None,
+            session=mock_get_clientsession.return_value,
         )
         async_add_entities_mock.assert_called_once()
+        # No chime configured, so FFmpeg is not run at setup
+        mock_preload_chimes.assert_not_called()
+
+    @patch('custom_components.openai_tts.tts.async_get_clientsession')
+    @patch('custom_components.openai_tts.tts._async_preload_chimes', new_callable=AsyncMock)
+    @patch('custom_components.openai_tts.tts.OpenAITTSEngine')
+    async def test_async_setup_entry_preloads_chimes_when_enabled(self, MockOpenAITTSEngineConstructor, mock_preload_chimes, mock_get_clientsession):
+        """Test that chimes are preloaded in the background when an entry uses them."""
+        self.hass.data[DOMAIN] = {}
+
+        mock_config_entry = MagicMock(spec=ConfigEntry)
+        mock_config_entry.data = self.openai_config_data
+        mock_config_entry.options = {CONF_CHIME_ENABLE: True}
+
+        await async_setup_entry(self.hass, mock_config_entry, MagicMock())
+        await asyncio.sleep(0)
+
+        mock_preload_chimes.assert_called_once_with(self.hass)
+        self.assertIn(
+            f"{DOMAIN} chime preload",
+            [call.args[1] for call in self.hass.async_create_background_task.call_args_list],
+        )
 
 # Need aiohttp.web for mocking request/response in view tests
 import aiohttp.web
@@ -382,8 +768,33 @@ class TestOpenAITTSStreamingView(unittest.IsolatedAsyncioTestCase):
         }
 
 
+        # The view looks up the entity by entity_id and uses its engine and resolved settings
+        self.mock_entity = MagicMock()
+        self.mock_entity.engine = self.mock_engine
+        self.mock_entity.settings = _Settings(
+            voice=self.mock_config_entry.data[CONF_VOICE], speed=self.mock_config_entry.data[CONF_SPEED]
+        )
+        self.mock_entity.get_pending_message.return_value = "Test stream message"
+        self.message_hash = _stream_hash(self.mock_entity.settings, "Test stream message")
+        self.hass.data[DOMAIN] = {"entities": {"test_entity_id": self.mock_entity}}
+
+        # Empty stream cache by default
+        self.mock_cache = MagicMock()
+        self.mock_cache.get.return_value = None
+        self.mock_cache.async_put = AsyncMock()
+
         from custom_components.openai_tts.tts import OpenAITTSStreamingView # Import here
-        self.view = OpenAITTSStreamingView(self.hass, self.mock_engine, self.mock_config_entry)
+        self.view = OpenAITTSStreamingView(self.hass, self.mock_cache)
+
+    def _mock_stream_response(self):
+        """Return a StreamResponse mock that tracks whether headers were sent."""
+        response = AsyncMock(spec=aiohttp.web.StreamResponse)
+        response.headers = {}
+        response.prepared = False
+        async def prepare(request):
+            response.prepared = True
+        response.prepare.side_effect = prepare
+        return response
 
     async def test_view_get_successful_stream(self):
         """Test successful streaming from the view."""
@@ -397,45 +808,172 @@ class TestOpenAITTSStreamingView(unittest.IsolatedAsyncioTestCase):
 
         # Mock aiohttp.web.Request
         mock_request = MagicMock(spec=aiohttp.web.Request)
-        mock_request.query = {"message": "Test stream message"} # Message passed via query
 
         # Mock aiohttp.web.StreamResponse
         # We need to mock its methods like prepare, write, write_eof
-        mock_stream_response_instance = AsyncMock(spec=aiohttp.web.StreamResponse)
-        mock_stream_response_instance.headers = {} # Initialize headers attribute
+        mock_stream_response_instance = self._mock_stream_response()
 
         # Patch the StreamResponse constructor to return our mock instance
         with patch("aiohttp.web.StreamResponse", return_value=mock_stream_response_instance) as MockStreamResponseCls:
 
-            response_from_view = await self.view.get(mock_request, "test_entity_id", "test_message_hash")
+            response_from_view = await self.view.get(mock_request, "test_entity_id", self.message_hash)
 
             MockStreamResponseCls.assert_called_once() # Verify constructor was called
+            # The upstream synthesis is cancelled if the entity is removed
+            self.mock_entity.track_task.assert_called_once()
 
             # Check headers set on the response instance
             self.assertEqual(mock_stream_response_instance.content_type, "audio/mpeg")
-            self.assertEqual(mock_stream_response_instance.headers['Cache-Control'], 'no-cache, no-store, must-revalidate')
+            self.assertEqual(mock_stream_response_instance.headers['Cache-Control'], 'public, max-age=86400, immutable')
+            self.assertEqual(mock_stream_response_instance.headers['Accept-Ranges'], 'none')
 
             # Check methods called on the response instance
             mock_stream_response_instance.prepare.assert_called_once_with(mock_request)
 
-            self.assertEqual(mock_stream_response_instance.write.call_count, len(test_audio_chunks))
-            for i, chunk in enumerate(test_audio_chunks):
-                self.assertEqual(mock_stream_response_instance.write.call_args_list[i][0][0], chunk)
+            # Small chunks arriving back to back are coalesced into one write
+            mock_stream_response_instance.write.assert_called_once_with(b"".join(test_audio_chunks))
 
-            mock_stream_response_instance.write_eof.assert_called_once()
+            # aiohttp finishes the response itself once the handler returns
+            mock_stream_response_instance.write_eof.assert_not_called()
             self.assertEqual(response_from_view, mock_stream_response_instance)
 
-    async def test_view_get_missing_message_parameter(self):
-        """Test view response when 'message' query parameter is missing."""
+            # The complete audio is stored for replay
+            self.mock_cache.async_put.assert_called_once()
+            self.assertEqual(self.mock_cache.async_put.call_args[0][1], b"".join(test_audio_chunks))
+
+    async def test_view_get_flushes_buffered_audio_when_upstream_stalls(self):
+        """Test that buffered audio is sent at the flush deadline, not with the next chunk."""
+        async def mock_engine_tts_stream(*args, **kwargs):
+            yield b"chunk1"
+            await asyncio.sleep(0.2) # Upstream stalls well past STREAM_FLUSH_INTERVAL
+            yield b"chunk2"
+        self.mock_engine.get_tts = mock_engine_tts_stream
+
+        mock_stream_response_instance = self._mock_stream_response()
+        with patch("aiohttp.web.StreamResponse", return_value=mock_stream_response_instance):
+            await self.view.get(MagicMock(spec=aiohttp.web.Request), "test_entity_id", self.message_hash)
+
+        writes = [call.args[0] for call in mock_stream_response_instance.write.call_args_list]
+        self.assertEqual(writes, [b"chunk1", b"chunk2"])
+
+    async def test_view_get_concurrent_requests_share_synthesis(self):
+        """Test that simultaneous requests for the same audio share one engine call."""
+        test_audio_chunks = [b"chunk1", b"chunk2"]
+        calls = 0
+
+        async def mock_engine_tts_stream(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            for chunk in test_audio_chunks:
+                await asyncio.sleep(0)
+                yield chunk
+        self.mock_engine.get_tts = mock_engine_tts_stream
+
+        responses = [self._mock_stream_response(), self._mock_stream_response()]
+        with patch("aiohttp.web.StreamResponse", side_effect=responses):
+            await asyncio.gather(
+                self.view.get(MagicMock(spec=aiohttp.web.Request), "test_entity_id", self.message_hash),
+                self.view.get(MagicMock(spec=aiohttp.web.Request), "test_entity_id", self.message_hash),
+            )
+
+        self.assertEqual(calls, 1)
+        for response in responses:
+            written = b"".join(call.args[0] for call in response.write.call_args_list)
+            self.assertEqual(written, b"".join(test_audio_chunks))
+        self.mock_cache.async_put.assert_called_once()
+        await asyncio.sleep(0) # Let the producer finish after its cache write
+        self.assertEqual(self.view._inflight, {})
+
+    async def test_view_get_joins_stream_while_caching(self):
+        """Test that a request arriving while the audio is written to the cache doesn't synthesize again."""
+        calls = 0
+
+        async def mock_engine_tts_stream(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            yield b"chunk1"
+        self.mock_engine.get_tts = mock_engine_tts_stream
+
+        cache_written = asyncio.Event()
+        async def slow_put(key, audio):
+            await cache_written.wait()
+        self.mock_cache.async_put.side_effect = slow_put
+
+        responses = [self._mock_stream_response(), self._mock_stream_response()]
+        with patch("aiohttp.web.StreamResponse", side_effect=responses):
+            await self.view.get(MagicMock(spec=aiohttp.web.Request), "test_entity_id", self.message_hash)
+            self.mock_cache.async_put.assert_called_once()
+            # Not cached yet, but the finished stream is still shared
+            await self.view.get(MagicMock(spec=aiohttp.web.Request), "test_entity_id", self.message_hash)
+
+        self.assertEqual(calls, 1)
+        responses[1].write.assert_called_once_with(b"chunk1")
+        cache_written.set()
+        await asyncio.sleep(0)
+        self.assertEqual(self.view._inflight, {})
+
+    async def test_view_get_cached_audio(self):
+        """Test that cached audio is served from disk without calling the engine."""
+        self.mock_cache.get.return_value = "/cache/audio.mp3"
+
         mock_request = MagicMock(spec=aiohttp.web.Request)
-        mock_request.query = {} # 'message' parameter is missing
+
+        with patch("aiohttp.web.FileResponse") as MockFileResponseCls:
+            response_from_view = await self.view.get(mock_request, "test_entity_id", self.message_hash)
+
+            MockFileResponseCls.assert_called_once()
+            self.assertEqual(MockFileResponseCls.call_args[0][0], "/cache/audio.mp3")
+            self.assertEqual(
+                MockFileResponseCls.call_args.kwargs["headers"]["Cache-Control"], "public, max-age=86400, immutable"
+            )
+            self.assertEqual(response_from_view, MockFileResponseCls.return_value)
+        self.mock_engine.get_tts.assert_not_called()
+        self.mock_cache.async_put.assert_not_called()
+
+    async def test_view_get_missing_message(self):
+        """Test view response when no message is pending for the hash."""
+        mock_request = MagicMock(spec=aiohttp.web.Request)
+        self.mock_entity.get_pending_message.return_value = None # Unknown or expired hash
 
         # We expect a plain aiohttp.web.Response, not StreamResponse, for this error
         with patch("aiohttp.web.Response", spec=aiohttp.web.Response) as MockPlainResponseCls:
             # Call the view's get method
-            await self.view.get(mock_request, "test_entity_id", "test_message_hash")
-            # Assert that aiohttp.web.Response was called with status 400
-            MockPlainResponseCls.assert_called_once_with(status=400, text="Missing 'message' query parameter")
+            await self.view.get(mock_request, "test_entity_id", self.message_hash)
+            # Assert that aiohttp.web.Response was called with status 404
+            MockPlainResponseCls.assert_called_once_with(status=404, text="Unknown or expired message")
+        self.mock_engine.get_tts.assert_not_called()
+
+    async def test_view_get_hash_mismatch(self):
+        """Test that a hash not matching the message and current settings is rejected."""
+        self.mock_entity.settings = _Settings(voice="echo") # Settings changed after the URL was handed out
+
+        with patch("aiohttp.web.Response", spec=aiohttp.web.Response) as MockPlainResponseCls:
+            await self.view.get(MagicMock(spec=aiohttp.web.Request), "test_entity_id", self.message_hash)
+            MockPlainResponseCls.assert_called_once_with(status=400, text="Message hash does not match")
+        self.mock_engine.get_tts.assert_not_called()
+
+    async def test_stream_hash_covers_model_url_and_instructions(self):
+        """Test that audio from another model, server or instructions gets another URL."""
+        base = _Settings(model="tts-1", url="https://api.openai.com/v1/audio/speech", voice="alloy")
+        hashes = {
+            _stream_hash(settings, "Hello")
+            for settings in (
+                base,
+                _Settings(model="tts-1-hd", url=base.url, voice="alloy"),
+                _Settings(model="tts-1", url="http://localhost:8880/v1/audio/speech", voice="alloy"),
+                _Settings(model="tts-1", url=base.url, voice="alloy", instructions="Whisper"),
+            )
+        }
+        self.assertEqual(len(hashes), 4)
+
+    async def test_view_get_unknown_entity(self):
+        """Test view response when the entity_id is not a known entity of this integration."""
+        mock_request = MagicMock(spec=aiohttp.web.Request)
+
+        with patch("aiohttp.web.Response", spec=aiohttp.web.Response) as MockPlainResponseCls:
+            await self.view.get(mock_request, "tts.unknown_entity", "test_message_hash")
+            MockPlainResponseCls.assert_called_once_with(status=404, text="Unknown TTS entity")
+        self.mock_engine.get_tts.assert_not_called()
 
     @patch('custom_components.openai_tts.tts._LOGGER')
     async def test_view_get_engine_error_before_stream_prepare(self, mock_logger):
@@ -443,23 +981,38 @@ class TestOpenAITTSStreamingView(unittest.IsolatedAsyncioTestCase):
         self.mock_engine.get_tts.side_effect = HomeAssistantError("Engine TTS pre-stream failure")
 
         mock_request = MagicMock(spec=aiohttp.web.Request)
-        mock_request.query = {"message": "Test error case"}
+        self.mock_entity.get_pending_message.return_value = "Test error case"
+        self.message_hash = _stream_hash(self.mock_entity.settings, "Test error case")
 
         # Mock StreamResponse, but its methods shouldn't be called if error is early
-        mock_stream_response_instance = AsyncMock(spec=aiohttp.web.StreamResponse)
-        mock_stream_response_instance.headers = {}
-        mock_stream_response_instance.prepared = False # Simulate headers not yet sent
+        mock_stream_response_instance = self._mock_stream_response()
 
         with patch("aiohttp.web.StreamResponse", return_value=mock_stream_response_instance):
             # We expect the HomeAssistantError to propagate if it happens before response.prepare
             # Or, if the view catches it and returns a 500, we'd test for that.
             # Based on current view code, it re-raises if response.prepared is False.
             with self.assertRaises(HomeAssistantError):
-                 await self.view.get(mock_request, "test_entity_id", "test_message_hash")
+                 await self.view.get(mock_request, "test_entity_id", self.message_hash)
 
             mock_logger.exception.assert_called() # Check that an error was logged
             mock_stream_response_instance.prepare.assert_not_called() # Stream should not have been prepared
 
+    async def test_view_get_engine_returns_no_audio(self):
+        """Test that an empty upstream response is an error, not cached empty audio."""
+        async def mock_engine_tts_empty(*args, **kwargs):
+            return
+            yield
+        self.mock_engine.get_tts = mock_engine_tts_empty
+
+        mock_stream_response_instance = self._mock_stream_response()
+
+        with patch("aiohttp.web.StreamResponse", return_value=mock_stream_response_instance):
+            with self.assertRaises(HomeAssistantError):
+                await self.view.get(MagicMock(spec=aiohttp.web.Request), "test_entity_id", self.message_hash)
+
+        mock_stream_response_instance.prepare.assert_not_called()
+        self.mock_cache.async_put.assert_not_called()
+
     @patch('custom_components.openai_tts.tts._LOGGER')
     async def test_view_get_cancelled_error_during_streaming(self, mock_logger):
         """Test view handling for CancelledError during streaming."""
@@ -472,23 +1025,39 @@ class TestOpenAITTSStreamingView(unittest.IsolatedAsyncioTestCase):
         self.mock_engine.get_tts = mock_engine_tts_cancel
 
         mock_request = MagicMock(spec=aiohttp.web.Request)
-        mock_request.query = {"message": "Test cancellation"}
+        self.mock_entity.get_pending_message.return_value = "Test cancellation"
+        self.message_hash = _stream_hash(self.mock_entity.settings, "Test cancellation")
 
-        mock_stream_response_instance = AsyncMock(spec=aiohttp.web.StreamResponse)
-        mock_stream_response_instance.headers = {}
+        mock_stream_response_instance = self._mock_stream_response()
 
         with patch("aiohttp.web.StreamResponse", return_value=mock_stream_response_instance):
             with self.assertRaises(asyncio.CancelledError): # Expect CancelledError to propagate
-                await self.view.get(mock_request, "test_entity_id", "test_message_hash")
+                await self.view.get(mock_request, "test_entity_id", self.message_hash)
 
-            mock_stream_response_instance.prepare.assert_called_once_with(mock_request)
-            # Check that write was called for chunks before cancellation
-            self.assertEqual(mock_stream_response_instance.write.call_count, len(test_audio_chunks))
+            # Headers go out with the first flush, which never happened
+            mock_stream_response_instance.prepare.assert_not_called()
+            # Chunks still buffered when the client goes away are dropped
+            mock_stream_response_instance.write.assert_not_called()
             mock_stream_response_instance.write_eof.assert_not_called() # EOF should not be sent
             mock_logger.debug.assert_called_with(
                 "Streaming TTS request cancelled by client for entity_id: %s, message_hash: %s",
-                "test_entity_id", "test_message_hash"
+                "test_entity_id", self.message_hash
             )
 
+    async def test_stream_cache_cleans_up_temporary_files(self):
+        """Test that failed cache writes and stale temporary files leave nothing behind."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            stale_path = os.path.join(cache_dir, "old_entry.mp3.tmp")
+            with open(stale_path, "wb") as file:
+                file.write(b"partial")
+            cache = _StreamAudioCache(self.hass, cache_dir)
+            await cache.async_load()
+            self.assertFalse(os.path.exists(stale_path))
+
+            with patch("os.replace", side_effect=OSError("No space left on device")):
+                await cache.async_put("new_entry", b"audio")
+            self.assertEqual(os.listdir(cache_dir), [])
+            self.assertIsNone(cache.get("new_entry"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,20 +2,34 @@
 Setting up TTS entity.
 """
 from __future__ import annotations
+import asyncio
+import hashlib
+import hmac
+import json
 import io
 import logging
+import math
 import os
-import subprocess
-import tempfile
 import time
 from asyncio import CancelledError
-from functools import partial # Added for subprocess.run
+from collections import OrderedDict
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+from functools import cached_property, partial
+from pathlib import Path
 
+import aiohttp.web
 from homeassistant.components.tts import TextToSpeechEntity
+try:
+    from homeassistant.components.tts import TTSAudioRequest, TTSAudioResponse
+except ImportError: # Older Home Assistant releases have no streaming TTS
+    TTSAudioRequest = TTSAudioResponse = None
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import generate_entity_id
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .const import (
     CONF_API_KEY,
     CONF_MODEL,
@@ -38,15 +52,307 @@ from .const import (
     # CONF_KOKORO_VOICE_ALLOW_BLENDING is not directly used in tts.py, it's for config_flow
 )
 from .openaitts_engine import OpenAITTSEngine
-from homeassistant.exceptions import MaxLengthExceeded
+from homeassistant.exceptions import HomeAssistantError, MaxLengthExceeded
 from homeassistant.components import media_source
 from homeassistant.components.http import HomeAssistantView
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.network import get_url
 
 _LOGGER = logging.getLogger(__name__)
 
 # Define a constant for the streaming view URL
 STREAMING_VIEW_URL = "/api/tts_openai_stream/{entity_id}/{message_hash}"
+# Upstream audio is buffered until this many bytes or seconds have accumulated
+STREAM_FLUSH_BYTES = 65536
+STREAM_FLUSH_INTERVAL = 0.05
+# Streaming URLs are content-addressed (the hash covers the message and every
+# setting shaping the audio), so the audio behind a URL never changes and
+# clients may keep it
+STREAM_CACHE_CONTROL = "public, max-age=86400, immutable"
+# Number of fully streamed messages kept on disk for replay
+STREAM_CACHE_MAX_ENTRIES = 100
+# Seconds a media player has to fetch a streaming URL handed out by get_tts_audio
+PENDING_MESSAGE_TTL = 600
+# Most streaming URLs per entity that can be waiting to be fetched at once
+PENDING_MESSAGE_MAX_ENTRIES = 128
+
+
+# Integrated loudness (LUFS) audio is normalized to
+NORMALIZE_TARGET_LUFS = -16
+
+# Folder holding the bundled (and user-supplied) chime sounds
+CHIME_DIR = Path(__file__).parent / "chime"
+
+# Output encoding shared by the chime cache and processed TTS audio. Xing/ID3
+# headers are left out so both can be spliced together as plain MP3 frames.
+_OUTPUT_SAMPLE_RATE = 24000
+_OUTPUT_CHANNELS = 1
+_FFMPEG_OUTPUT_ARGS = [
+    "-c:a", "libmp3lame", "-ac", str(_OUTPUT_CHANNELS), "-ar", str(_OUTPUT_SAMPLE_RATE), "-b:a", "128k",
+    # LAME encodes on a single thread and has no presets; short clips gain nothing from more
+    "-threads", "1",
+    "-write_xing", "0", "-id3v2_version", "0", "-map_metadata", "-1",
+    "-f", "mp3", "pipe:1",
+]
+# Only errors end up on stderr (which is logged on failure); no banner, no keyboard handling
+_FFMPEG_GLOBAL_ARGS = ["-hide_banner", "-nostdin", "-loglevel", "error"]
+# Bounds concurrent FFmpeg processes, so a burst of announcements can't
+# oversubscribe the CPU of a small Home Assistant host. Audio piped in while it
+# downloads would hold a slot for the whole transfer (up to the API timeout), so
+# when all slots are taken it is downloaded first and only then waits for one.
+_FFMPEG_SEMAPHORE = asyncio.Semaphore(max(1, (os.cpu_count() or 2) // 2))
+# TTS audio piped to FFmpeg's stdin
+_FFMPEG_TTS_INPUT_ARGS = ["-f", "mp3", "-i", "pipe:0"]
+# Normalization filters: measuring with loudnorm while no gain is known, and
+# applying a known gain limited to -1 dBTP (0.891), like loudnorm's TP=-1. The
+# limiter's auto-level would scale the output back up to 0 dBFS, so it is disabled.
+_LOUDNORM_FILTER = f"loudnorm=I={NORMALIZE_TARGET_LUFS}:TP=-1:LRA=5:print_format=json"
+_GAIN_FILTER = "volume={gain:.2f}dB,alimiter=limit=0.891:level=disabled"
+# Measurements of quieter audio (e.g. a message that is mostly silence) don't
+# represent the voice and would store a huge gain; they are not kept
+_LOUDNORM_MIN_INPUT_LUFS = -40
+
+# Chime file name -> chime re-encoded with _FFMPEG_OUTPUT_ARGS. Filled once at
+# setup so chime requests never decode the chime file again. Users can drop their
+# own chimes into CHIME_DIR, so only the most recently used ones are kept.
+_CHIME_CACHE: OrderedDict[str, bytes] = OrderedDict()
+_CHIME_CACHE_MAX_ENTRIES = 16
+# Chime file names that could not be loaded; not retried until asked to
+_FAILED_CHIMES: set[str] = set()
+
+
+# Sample rates by MPEG version bits of an MP3 frame header (1 is reserved)
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000), # MPEG-1
+    2: (22050, 24000, 16000), # MPEG-2
+    0: (11025, 12000, 8000), # MPEG-2.5
+}
+
+
+def _probe_mp3(data: bytes) -> tuple[int, int, int] | None:
+    """Return (offset of the first frame, sample rate, channels) of MP3 audio.
+
+    Leading ID3v2 tags are skipped. Returns None if no Layer III frame header is
+    found near the start of the data.
+    """
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Syncsafe tag size, plus the header and optional footer
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        offset = size + (20 if data[5] & 0x10 else 10)
+    end = min(len(data) - 3, offset + 4096)
+    while (offset := data.find(b"\xff", offset, end)) != -1:
+        b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+        version = (b1 >> 3) & 0x03
+        rate_index = (b2 >> 2) & 0x03
+        if (
+            b1 & 0xE0 == 0xE0
+            and version in _MP3_SAMPLE_RATES
+            and (b1 >> 1) & 0x03 == 1 # Layer III
+            and b2 >> 4 not in (0, 0x0F) # Free format / invalid bitrate
+            and rate_index != 3
+        ):
+            channels = 1 if b3 >> 6 == 3 else 2
+            return offset, _MP3_SAMPLE_RATES[version][rate_index], channels
+        offset += 1
+    return None
+
+
+async def _async_feed_stdin(stdin: asyncio.StreamWriter, chunks: AsyncIterable[bytes]) -> None:
+    """Write chunks to FFmpeg's stdin as they arrive, then close it.
+
+    The chunks are consumed completely even if FFmpeg exits early, so callers
+    collecting them along the way still end up with all of the audio.
+    """
+    broken = False
+    async for chunk in chunks:
+        if broken:
+            continue
+        try:
+            stdin.write(chunk)
+            await stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            broken = True
+    stdin.close()
+
+
+async def _async_run_ffmpeg(
+    input_args: list[str],
+    input_data: bytes | AsyncIterable[bytes] | None = None,
+    stderr_out: bytearray | None = None,
+) -> bytes | None:
+    """Run FFmpeg as an asyncio subprocess and return its stdout.
+
+    Output is always encoded with _FFMPEG_OUTPUT_ARGS. `input_data` is piped to
+    stdin if given; chunks of an async iterable are written as they arrive so
+    FFmpeg can work while they are still being downloaded. FFmpeg's log output
+    is collected in stderr_out if given. Returns None if FFmpeg could not be run
+    or failed.
+    """
+    ffmpeg_cmd_list = ["ffmpeg", "-y", *_FFMPEG_GLOBAL_ARGS, *input_args, *_FFMPEG_OUTPUT_ARGS]
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug("Executing FFmpeg command: %s", " ".join(ffmpeg_cmd_list))
+    if _FFMPEG_SEMAPHORE.locked() and not (input_data is None or isinstance(input_data, bytes)):
+        # Don't keep the download (and the requests queued behind it) waiting for a slot
+        input_data = b"".join([chunk async for chunk in input_data])
+    async with _FFMPEG_SEMAPHORE:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *ffmpeg_cmd_list,
+                stdin=asyncio.subprocess.PIPE if input_data is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as err:
+            _LOGGER.error("Could not start FFmpeg: %s", err)
+            return None
+        if input_data is None or isinstance(input_data, bytes):
+            stdout, stderr = await process.communicate(input=input_data)
+        else:
+            try:
+                _, stdout, stderr = await asyncio.gather(
+                    _async_feed_stdin(process.stdin, input_data),
+                    process.stdout.read(),
+                    process.stderr.read(),
+                )
+            except BaseException:
+                # The audio source failed or we were cancelled; don't leave FFmpeg running
+                if process.returncode is None:
+                    process.kill()
+                raise
+            await process.wait()
+    _LOGGER.debug("FFmpeg return code: %d", process.returncode)
+    if stderr_out is not None:
+        stderr_out.extend(stderr)
+
+    if process.returncode != 0 or not stdout:
+        _LOGGER.error("FFmpeg failed. Stderr: %s", stderr.decode(errors="replace"))
+        return None
+    return stdout
+
+
+async def _async_get_chime(chime_file_name: str, retry: bool = False) -> bytes | None:
+    """Return the re-encoded chime, loading it into the cache on first use.
+
+    Names that failed to load before are skipped without running FFmpeg again,
+    unless `retry` is set.
+    """
+    if (chime := _CHIME_CACHE.get(chime_file_name)) is not None:
+        _CHIME_CACHE.move_to_end(chime_file_name)
+        return chime
+    if chime_file_name in _FAILED_CHIMES and not retry:
+        return None
+    chime_file_path = CHIME_DIR / chime_file_name
+    if chime_file_path.name != chime_file_name:
+        # Chime names come from service calls too; never read outside CHIME_DIR
+        _LOGGER.error("Invalid chime file name %s. Skipping chime.", chime_file_name)
+        return None
+    _LOGGER.debug("Loading chime file: %s", chime_file_path)
+    chime = await _async_run_ffmpeg(["-i", str(chime_file_path)])
+    if chime is None:
+        _LOGGER.error("Could not load chime file %s. Skipping chime.", chime_file_path)
+        _FAILED_CHIMES.add(chime_file_name)
+        return None
+    _FAILED_CHIMES.discard(chime_file_name)
+    _CHIME_CACHE[chime_file_name] = chime
+    while len(_CHIME_CACHE) > _CHIME_CACHE_MAX_ENTRIES:
+        _CHIME_CACHE.popitem(last=False)
+    return chime
+
+
+def _chime_file_name(chime_sound: str) -> str:
+    """Return the file name of a configured chime sound, which may omit .mp3."""
+    if not chime_sound.lower().endswith(".mp3"):
+        return f"{chime_sound}.mp3"
+    return chime_sound
+
+
+async def _async_preload_chimes(hass: HomeAssistant) -> None:
+    """Decode and re-encode every chime in CHIME_DIR once."""
+    try:
+        files = await hass.async_add_executor_job(os.listdir, CHIME_DIR)
+    except OSError as err:
+        _LOGGER.error("Error listing chime folder: %s", err)
+        return
+    # Don't preload more chimes than the cache keeps; encode them concurrently
+    chimes = sorted(file for file in files if file.lower().endswith(".mp3"))
+    # Chimes loaded (or failed) for an earlier entry are not encoded again
+    await asyncio.gather(*(_async_get_chime(file) for file in chimes[:_CHIME_CACHE_MAX_ENTRIES]))
+
+
+def _loudnorm_gain(ffmpeg_log: bytes) -> float | None:
+    """Return the gain (dB) reaching NORMALIZE_TARGET_LUFS, from loudnorm's JSON report."""
+    text = ffmpeg_log.decode(errors="replace")
+    start, end = text.rfind("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        input_i = float(json.loads(text[start:end + 1])["input_i"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not math.isfinite(input_i) or input_i < _LOUDNORM_MIN_INPUT_LUFS: # Silence measures as -inf
+        return None
+    return NORMALIZE_TARGET_LUFS - input_i
+
+
+async def _async_normalize(
+    chunks: AsyncIterable[bytes], raw_audio: bytearray, gain: float | None
+) -> tuple[bytes | None, float | None]:
+    """Loudness-normalize TTS audio while it is still being downloaded.
+
+    Chunks are piped into FFmpeg as they arrive and also collected in raw_audio,
+    which callers fall back to if FFmpeg fails (None is returned).
+
+    A voice's loudness hardly varies between messages, so the full (and costly)
+    loudnorm filter only runs while no gain is known; it also measures the gain
+    that is returned for later calls, which then just apply it with a limiter.
+    """
+    async def tee():
+        async for chunk in chunks:
+            raw_audio.extend(chunk)
+            yield chunk
+
+    if gain is None:
+        # loudnorm reports its measurement at info level
+        input_args = ["-loglevel", "info", *_FFMPEG_TTS_INPUT_ARGS, "-af", _LOUDNORM_FILTER]
+    else:
+        input_args = [*_FFMPEG_TTS_INPUT_ARGS, "-af", _GAIN_FILTER.format(gain=gain)]
+    ffmpeg_log = bytearray()
+    stream = tee()
+    processed = await _async_run_ffmpeg(input_args, stream, ffmpeg_log)
+    if processed is None:
+        # FFmpeg may have failed before reading everything; collect the rest
+        async for _chunk in stream:
+            pass
+        return None, gain
+    if gain is None:
+        gain = _loudnorm_gain(ffmpeg_log)
+        _LOGGER.debug("Measured normalization gain: %s dB", gain)
+    return processed, gain
+
+
+async def _async_prepend_chime(tts_bytes: bytes, chime_bytes: bytes) -> bytes:
+    """Prepend the cached chime frames to TTS audio.
+
+    TTS audio in another format is re-encoded by FFmpeg to match the chime.
+    Returns the original audio if FFmpeg fails.
+    """
+    # MP3 frames with the same sample rate and channels can simply be joined,
+    # which is the case for OpenAI and Kokoro output. No FFmpeg run needed.
+    probe = _probe_mp3(tts_bytes)
+    if probe is not None and probe[1:] == (_OUTPUT_SAMPLE_RATE, _OUTPUT_CHANNELS):
+        end = len(tts_bytes)
+        if tts_bytes[-128:-125] == b"TAG": # Trailing ID3v1 tag
+            end -= 128
+        # Join through a memoryview so the audio is copied once, not sliced first
+        return chime_bytes + memoryview(tts_bytes)[probe[0]:end]
+
+    processed = await _async_run_ffmpeg(_FFMPEG_TTS_INPUT_ARGS, tts_bytes)
+    if processed is None:
+        # Fallback to original audio content if FFmpeg fails
+        return tts_bytes
+    return chime_bytes + processed
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -85,33 +391,184 @@ async def async_setup_entry(
         model=config_entry.data[CONF_MODEL], # Initial model from setup
         speed=config_entry.data.get(CONF_SPEED, 1.0), # Initial speed from setup
         url=api_url,
-        chunk_size=kokoro_chunk_size # Pass chunk_size to engine
+        chunk_size=kokoro_chunk_size, # Pass chunk_size to engine
+        session=async_get_clientsession(hass), # Share Home Assistant's connection pool
     )
-    
-    # ---- START DEBUG ----
-    _LOGGER.debug("DEBUG: Attempting to instantiate KokoroOpenAITTSEntity.")
-    _LOGGER.debug("DEBUG: Type of KokoroOpenAITTSEntity variable in this scope: %s", type(KokoroOpenAITTSEntity))
-    try:
-        our_class_from_mro = KokoroOpenAITTSEntity.mro()[0] # Should be custom_components.openai_tts.tts.KokoroOpenAITTSEntity
-        _LOGGER.debug("DEBUG: MRO[0] is: %s", our_class_from_mro)
-        _LOGGER.debug("DEBUG: MRO[0].__init__ signature: %s", inspect.signature(our_class_from_mro.__init__))
-        
-        # Also inspect the __init__ of the variable KokoroOpenAITTSEntity directly, as before
-        _LOGGER.debug("DEBUG: Direct KokoroOpenAITTSEntity __init__ signature: %s", inspect.signature(KokoroOpenAITTSEntity.__init__))
-        _LOGGER.debug("DEBUG: KokoroOpenAITTSEntity.this_is_a_test_method signature: %s", inspect.signature(KokoroOpenAITTSEntity.this_is_a_test_method))
-
-    except Exception as e_inspect:
-        _LOGGER.debug("DEBUG: Error inspecting KokoroOpenAITTSEntity: %s", e_inspect)
-    # ---- END DEBUG ----
+
+    if _Settings.from_entry(config_entry).chime_enable:
+        # Decode the chime sounds once so chime requests only need to process the TTS
+        # audio. FFmpeg is only needed once chimes are used, so entries without them
+        # don't run it, and setup does not wait for it.
+        hass.async_create_background_task(_async_preload_chimes(hass), f"{DOMAIN} chime preload")
 
     entity = KokoroOpenAITTSEntity(hass, config_entry, engine)
     async_add_entities([entity])
 
-    # Register the streaming view
-    hass.http.register_view(OpenAITTSStreamingView(hass, engine, config_entry))
+    # Register the streaming view once; it serves every entity of this integration
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if not domain_data.get("streaming_view_registered"):
+        # Stored under Home Assistant's tts cache folder, which backups leave out
+        stream_cache = _StreamAudioCache(hass, hass.config.path("tts", f"{DOMAIN}_stream"))
+        await stream_cache.async_load()
+        hass.http.register_view(OpenAITTSStreamingView(hass, stream_cache))
+        domain_data["streaming_view_registered"] = True
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """Write a file atomically, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # E.g. a full disk; don't leave the partial file behind
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _remove_files(paths: list[str]) -> None:
+    """Remove files, ignoring ones that are already gone."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            _LOGGER.warning("Could not remove cached stream audio %s: %s", path, err)
+
+
+class _StreamAudioCache:
+    """Bounded on-disk LRU cache of audio served by the streaming view.
+
+    Cache hits are served straight from disk with FileResponse, which uses
+    sendfile() and never copies the audio through user space.
+    """
+
+    def __init__(self, hass: HomeAssistant, cache_dir: str, max_entries: int = STREAM_CACHE_MAX_ENTRIES) -> None:
+        self.hass = hass
+        self._cache_dir = cache_dir
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict() # cache key -> file path
+
+    def _scan(self) -> list[str]:
+        """Create the cache folder and return existing entries, oldest first.
+
+        Temporary files left by a write that never finished are removed.
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.name.endswith(".mp3"):
+                entries.append(entry)
+            elif entry.name.endswith(".mp3.tmp"):
+                _remove_files([entry.path])
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        return [entry.path for entry in entries]
+
+    async def async_load(self) -> None:
+        """Index audio cached by a previous run."""
+        try:
+            paths = await self.hass.async_add_executor_job(self._scan)
+        except OSError as err:
+            _LOGGER.warning("Could not read stream cache folder %s: %s", self._cache_dir, err)
+            return
+        for path in paths:
+            self._entries[os.path.basename(path)[:-4]] = path
+        await self._async_evict()
+
+    def get(self, key: str) -> str | None:
+        """Return the path of the cached audio for key, if any."""
+        path = self._entries.get(key)
+        if path is not None:
+            self._entries.move_to_end(key)
+        return path
+
+    async def async_put(self, key: str, audio: bytes) -> None:
+        """Store audio for key, evicting the least recently used entries."""
+        path = os.path.join(self._cache_dir, f"{key}.mp3")
+        try:
+            await self.hass.async_add_executor_job(_write_file, path, audio)
+        except OSError as err:
+            _LOGGER.warning("Could not cache stream audio at %s: %s", path, err)
+            return
+        self._entries[key] = path
+        self._entries.move_to_end(key)
+        await self._async_evict()
+
+    async def _async_evict(self) -> None:
+        evicted = []
+        while len(self._entries) > self._max_entries:
+            evicted.append(self._entries.popitem(last=False)[1])
+        if evicted:
+            await self.hass.async_add_executor_job(_remove_files, evicted)
+
+class _SharedStream:
+    """Audio chunks of one upstream synthesis, readable by any number of clients.
+
+    Every client reads from the first chunk on, so a client that joins late still
+    receives the complete audio.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self._done = False
+        self._error: BaseException | None = None
+        self._changed = asyncio.Event()
+
+    def append(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self._done = True
+        self._error = error
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake the current waiters; later waiters wait on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def async_read(self, index: int, timeout: float | None = None) -> list[bytes] | None:
+        """Return the chunks from index on, waiting up to timeout for new ones.
+
+        Returns an empty list on timeout and None once every chunk was read.
+        Raises the upstream error if the synthesis failed.
+        """
+        if index >= len(self.chunks) and not self._done:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._changed.wait()
+            except TimeoutError:
+                return []
+        if index < len(self.chunks):
+            return self.chunks[index:]
+        if self._error is not None:
+            raise self._error
+        return None
+
+
+async def _async_fill_stream(stream: _SharedStream, chunks: AsyncIterable[bytes]) -> None:
+    """Append audio chunks to the stream as they arrive, then finish it.
+
+    Errors (and cancellation) are passed on to the stream's readers.
+    """
+    try:
+        async for chunk in chunks:
+            if chunk:
+                stream.append(chunk)
+    except CancelledError as err:
+        stream.finish(err)
+        raise
+    except Exception as err:
+        stream.finish(err)
+        return
+    stream.finish()
 
-# Need to import aiohttp.web for StreamResponse
-import aiohttp.web
 
 class OpenAITTSStreamingView(HomeAssistantView):
     """View to stream TTS audio."""
@@ -120,55 +577,100 @@ class OpenAITTSStreamingView(HomeAssistantView):
     url = STREAMING_VIEW_URL
     name = "api:tts_openai_stream" # Matches the /api/ part of the URL for Home Assistant
 
-    def __init__(self, hass: HomeAssistant, engine: OpenAITTSEngine, config_entry: ConfigEntry):
+    def __init__(self, hass: HomeAssistant, cache: _StreamAudioCache):
         """Initialize the streaming view."""
         self.hass = hass
-        self._engine = engine
-        self._config = config_entry
+        self._cache = cache
+        self._inflight: dict[str, _SharedStream] = {}
 
     async def get(self, request: aiohttp.web.Request, entity_id: str, message_hash: str) -> aiohttp.web.StreamResponse:
         """Stream TTS audio."""
 
-        message = request.query.get("message")
+        entity = self.hass.data.get(DOMAIN, {}).get("entities", {}).get(entity_id)
+        if entity is None:
+            _LOGGER.error("Streaming request for unknown entity_id: %s", entity_id)
+            return aiohttp.web.Response(status=404, text="Unknown TTS entity")
+
+        # Messages are handed over by get_tts_audio, keyed by their hash. They are not
+        # removed on read so retries and several players can fetch the same URL.
+        message = entity.get_pending_message(message_hash)
         if not message:
-            _LOGGER.error("Streaming request for %s/%s missing 'message' query parameter.", entity_id, message_hash)
+            _LOGGER.error("Streaming request for %s/%s has no pending message.", entity_id, message_hash)
             # Return a plain text error, or could be JSON
-            return aiohttp.web.Response(status=400, text="Missing 'message' query parameter")
-
-        # Retrieve current voice and speed settings from config entry (options override data)
-        # This ensures that if the user changes voice/speed in options, the stream uses them.
-        effective_voice = self._config.options.get(CONF_VOICE, self._config.data.get(CONF_VOICE))
-        current_speed = self._config.options.get(CONF_SPEED, self._config.data.get(CONF_SPEED, 1.0))
-        # Instructions are generally not passed for simple streaming to avoid URL complexity.
-        # If needed, they could be added to the query string or retrieved from a cache.
-        # For now, we omit passing instructions to the engine in this streaming path.
-
-        _LOGGER.debug(
-            "Streaming request for entity_id: %s, message_hash: %s, voice: %s, speed: %s, message (first 30 chars): '%s'",
-            entity_id, message_hash, effective_voice, current_speed, message[:30]
-        )
+            return aiohttp.web.Response(status=404, text="Unknown or expired message")
+
+        # Use the entity's resolved settings (options override data).
+        # These are refreshed whenever the user changes the options.
+        settings = entity.settings
+        effective_voice = settings.voice
+        current_speed = settings.speed
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Streaming request for entity_id: %s, message_hash: %s, voice: %s, speed: %s, message (first 30 chars): '%s'",
+                entity_id, message_hash, effective_voice, current_speed, message[:30]
+            )
+
+        # The hash in the URL promises audio for this message with these settings, and
+        # clients and proxies cache it as such. If the settings changed since the URL
+        # was handed out, serving it would poison those caches.
+        if not hmac.compare_digest(_stream_hash(settings, message), message_hash):
+            _LOGGER.warning("Streaming request for %s/%s does not match the current settings.", entity_id, message_hash)
+            return aiohttp.web.Response(status=400, text="Message hash does not match")
+
+        # The same message with the same settings always produces the same audio
+        cache_key = f"{entity_id}_{message_hash}"
+        cached_path = self._cache.get(cache_key)
+        if cached_path is not None:
+            # FileResponse answers Range requests with 206 and sets Content-Length itself
+            _LOGGER.debug("Serving cached audio for entity_id: %s, message_hash: %s", entity_id, message_hash)
+            return aiohttp.web.FileResponse(
+                cached_path,
+                headers={"Content-Type": "audio/mpeg", "Cache-Control": STREAM_CACHE_CONTROL},
+            )
+
+        # Players started together (e.g. a multi-room announcement) request the same
+        # audio at the same time; share one upstream synthesis between all of them.
+        stream = self._inflight.get(cache_key)
+        if stream is None:
+            stream = self._inflight[cache_key] = _SharedStream()
+            entity.track_task(self.hass.async_create_background_task(
+                self._async_produce(cache_key, stream, entity, message, settings),
+                f"{DOMAIN} stream {message_hash}",
+            ))
+        else:
+            _LOGGER.debug("Joining in-flight stream for entity_id: %s, message_hash: %s", entity_id, message_hash)
 
         response = aiohttp.web.StreamResponse()
         # Set content type for the stream. Kokoro default is MP3.
         response.content_type = "audio/mpeg"
-        # Set Cache-Control headers to prevent caching of the stream by intermediate proxies or the client.
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-
-        await response.prepare(request)
+        # Let players and proxies keep the audio, so replays don't reach the backend at all
+        response.headers['Cache-Control'] = STREAM_CACHE_CONTROL
+        # The audio does not exist yet, so byte ranges cannot be honoured. Saying so stops
+        # players from retrying with Range requests; replays of the cached file support them.
+        response.headers['Accept-Ranges'] = 'none'
+        # Send chunks to the player as they arrive instead of waiting for the full length
+        response.enable_chunked_encoding()
 
         try:
-            async for chunk in self._engine.get_tts(
-                text=message,
-                speed=current_speed,
-                voice=effective_voice,
-                # instructions=effective_instructions, # Omitting for now
-            ):
-                if chunk: # Ensure chunk is not empty
-                    await response.write(chunk)
-
-            await response.write_eof() # Finalize the response stream
+            # Coalesce small upstream chunks so each write carries a useful amount of audio,
+            # but never hold buffered audio back for longer than STREAM_FLUSH_INTERVAL, even
+            # when upstream stalls: reads time out at the next flush deadline.
+            loop = asyncio.get_running_loop()
+            buffer = bytearray()
+            index = 0
+            next_flush = loop.time() + STREAM_FLUSH_INTERVAL
+            while (chunks := await stream.async_read(
+                index, max(next_flush - loop.time(), 0) if buffer else None
+            )) is not None:
+                index += len(chunks)
+                for chunk in chunks:
+                    buffer += chunk
+                if len(buffer) >= STREAM_FLUSH_BYTES or loop.time() >= next_flush:
+                    await self._async_flush(request, response, buffer)
+                    next_flush = loop.time() + STREAM_FLUSH_INTERVAL
+            await self._async_flush(request, response, buffer)
+            # aiohttp finishes the chunked body (write_eof) once the handler returns
             return response
 
         except CancelledError:
@@ -186,12 +688,104 @@ class OpenAITTSStreamingView(HomeAssistantView):
             # For robustness, one might check `response.prepared` but for now, re-raise.
             raise
 
-# ---- START DEBUG ----
-import inspect
-# _LOGGER.error("DEBUG: About to define KokoroOpenAITTSEntity. Current globals: %s", 'KokoroOpenAITTSEntity' in globals()) # Removed to reduce noise
-# ---- END DEBUG ----
+    async def _async_produce(
+        self, cache_key: str, stream: "_SharedStream", entity, message: str, settings: "_Settings"
+    ) -> None:
+        """Synthesize the audio once for every subscriber of the stream and cache it.
+
+        This runs independently of the requests, so a client disconnecting early does
+        not abort the synthesis for the other players.
+        """
+        try:
+            try:
+                async for chunk in entity.engine.get_tts(
+                    text=message, speed=settings.speed, voice=settings.voice, instructions=settings.instructions
+                ):
+                    if chunk: # Ensure chunk is not empty
+                        stream.append(chunk)
+            except CancelledError as err:
+                stream.finish(err)
+                raise
+            except Exception as err:
+                # Surfaced (and logged) by every request reading the stream
+                stream.finish(err)
+                return
+            if not stream.chunks:
+                # Never answer (or cache for replay) an empty body as if it were the audio
+                stream.finish(HomeAssistantError("TTS engine returned no audio"))
+                return
+            stream.finish()
+            await self._cache.async_put(cache_key, b"".join(stream.chunks))
+        finally:
+            # Requests arriving until the audio is cached still join the finished
+            # stream instead of starting another synthesis
+            self._inflight.pop(cache_key, None)
+
+    @staticmethod
+    async def _async_flush(
+        request: aiohttp.web.Request, response: aiohttp.web.StreamResponse, buffer: bytearray
+    ) -> None:
+        """Write out and clear the buffered audio, sending the headers first if needed.
+
+        Headers are sent with the first audio so an upstream failure before any audio
+        arrives can still be answered with an error status.
+        """
+        if not response.prepared:
+            await response.prepare(request)
+        if buffer:
+            await response.write(bytes(buffer))
+            buffer.clear()
+
+
+def _message_hash(message: str) -> str:
+    """Return a short identifier for a message, used in streaming URLs.
+
+    The hash only identifies the message, so the fast 64-bit BLAKE2b digest
+    (16 hex characters) is used instead of a truncated SHA-256.
+    """
+    return hashlib.blake2b(message.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _stream_hash(settings: _Settings, message: str) -> str:
+    """Return the hash identifying the audio for a message in streaming URLs.
+
+    It covers every setting the audio depends on, so a URL never refers to
+    audio made with another model, server, voice, speed or instructions.
+    """
+    return _message_hash(
+        f"{settings.model}\n{settings.url}\n{settings.voice}\n{settings.speed}\n{settings.instructions}\n{message}"
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _Settings:
+    """Settings of a config entry, resolved once (options override data)."""
+
+    # Model and URL are fixed at setup, as the engine is created with them
+    model: str | None = None
+    url: str | None = None
+    voice: str | None = None
+    speed: float = 1.0
+    instructions: str | None = None
+    chime_enable: bool = False
+    chime_file: str = "threetone.mp3"
+    normalize_audio: bool = False
+
+    @classmethod
+    def from_entry(cls, config: ConfigEntry) -> _Settings:
+        options = config.options
+        data = config.data
+        return cls(
+            model=data.get(CONF_MODEL),
+            url=data.get(CONF_KOKORO_URL if data.get(CONF_TTS_ENGINE) == KOKORO_FASTAPI_ENGINE else CONF_URL),
+            voice=options.get(CONF_VOICE, data.get(CONF_VOICE)),
+            speed=options.get(CONF_SPEED, data.get(CONF_SPEED, 1.0)),
+            instructions=options.get(CONF_INSTRUCTIONS, data.get(CONF_INSTRUCTIONS)),
+            chime_enable=options.get(CONF_CHIME_ENABLE, data.get(CONF_CHIME_ENABLE, False)),
+            chime_file=_chime_file_name(options.get(CONF_CHIME_SOUND, data.get(CONF_CHIME_SOUND, "threetone.mp3"))),
+            normalize_audio=options.get(CONF_NORMALIZE_AUDIO, data.get(CONF_NORMALIZE_AUDIO, False)),
+        )
 
-import hashlib # For message hashing
 
 class KokoroOpenAITTSEntity(TextToSpeechEntity):
     _attr_has_entity_name = True
@@ -219,7 +813,82 @@ class KokoroOpenAITTSEntity(TextToSpeechEntity):
             hass=hass
         )
         _LOGGER.debug("Initialized KokoroOpenAITTSEntity with entity_id: %s and unique_id: %s", self.entity_id, self._attr_unique_id)
+        # Requests read this snapshot instead of walking options/data on every call
+        self._settings = _Settings.from_entry(self._config)
+        # Voice -> gain (dB) normalizing its audio, measured on first use. The model
+        # is fixed per entry, so the voice is the only setting it depends on.
+        self._normalize_gains: dict[str, float] = {}
+        # message_hash -> (message, expiry), read by the streaming view
+        self._pending_messages: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        # Tasks currently downloading audio for this entity, cancelled on removal
+        self._inflight_tasks: set[asyncio.Task] = set()
+
+    async def _async_update_options(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+        """Refresh the resolved settings when the options change."""
+        self._settings = _Settings.from_entry(config_entry)
+        # The entry title (and with it the name) may have been edited
+        self.__dict__.pop("name", None)
+        self.__dict__.pop("device_info", None)
+        self._async_invalidate_stream_url()
+        if self._settings.chime_enable:
+            # Encode a newly selected chime (e.g. one added after setup) now,
+            # not during the next announcement
+            await _async_get_chime(self._settings.chime_file, retry=True)
 
+    @property
+    def settings(self) -> _Settings:
+        """Settings resolved from the config entry, replaced when the options change."""
+        return self._settings
+
+    @property
+    def engine(self) -> OpenAITTSEngine:
+        """Engine synthesizing this entity's audio."""
+        return self._engine
+
+    def get_pending_message(self, message_hash: str) -> str | None:
+        """Return the message waiting to be streamed under message_hash, if not expired."""
+        entry = self._pending_messages.get(message_hash)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    @callback
+    def _async_expire_pending_message(self, message_hash: str, _now) -> None:
+        """Drop a pending message once its TTL has passed."""
+        entry = self._pending_messages.get(message_hash)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self._pending_messages[message_hash]
+
+    @callback
+    def track_task(self, task: asyncio.Task) -> asyncio.Task:
+        """Cancel task (downloading audio for this entity) if the entity is removed."""
+        self._inflight_tasks.add(task)
+        task.add_done_callback(self._inflight_tasks.discard)
+        return task
+
+    @callback
+    def _async_invalidate_stream_url(self, _event: Event | None = None) -> None:
+        """Drop the cached streaming URL prefix; it is recomputed on next use."""
+        self.__dict__.pop("_stream_url_prefix", None)
+
+    @cached_property
+    def _stream_url_prefix(self) -> str:
+        """Streaming view URL for this entity, up to the message hash."""
+        # Ensure full URL is correctly formed using Home Assistant's get_url helper.
+        # prefer_external=True for broader player compatibility if HA is behind a proxy.
+        stream_url_path = STREAMING_VIEW_URL.format(entity_id=self.entity_id, message_hash="")
+        return f"{get_url(self.hass, prefer_external=True)}{stream_url_path}"
+
+    async def async_added_to_hass(self) -> None:
+        """Register the entity for the streaming view and listen for option changes."""
+        await super().async_added_to_hass()
+        self.hass.data.setdefault(DOMAIN, {}).setdefault("entities", {})[self.entity_id] = self
+        self._async_invalidate_stream_url() # entity_id may have been renamed
+        self.async_on_remove(self._config.add_update_listener(self._async_update_options))
+        # The external URL is part of the core configuration
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, self._async_invalidate_stream_url)
+        )
 
     @property
     def default_language(self) -> str:
@@ -237,14 +906,14 @@ class KokoroOpenAITTSEntity(TextToSpeechEntity):
             options.append(media_source.TTS_SPEAK_OPTIONS_KEY_MEDIA_SOURCE_ID)
         return options
 
-    @property
+    @cached_property
     def supported_languages(self) -> list:
         # Delegate to the engine if it has a method for this, otherwise return a sensible default.
         if hasattr(self._engine, 'get_supported_langs'):
             return self._engine.get_supported_langs()
         return ["en"] # Fallback if engine doesn't specify
 
-    @property
+    @cached_property
     def device_info(self) -> dict:
         engine_type = self._config.data.get(CONF_TTS_ENGINE, OPENAI_ENGINE)
         manufacturer = "OpenAI"
@@ -264,7 +933,7 @@ class KokoroOpenAITTSEntity(TextToSpeechEntity):
             "sw_version": "1.0", # Placeholder, could be dynamic
         }
 
-    @property
+    @cached_property
     def name(self) -> str:
         # Attempt to use the config entry's title for a user-friendly name.
         # Fallback to a generated name if title is not available.
@@ -277,47 +946,58 @@ class KokoroOpenAITTSEntity(TextToSpeechEntity):
         model_name = self._config.data.get(CONF_MODEL, "TTS")
         return f"{engine_type_display} {model_name}"
 
-    def this_is_a_test_method(self, foo: str, bar: int) -> bool:
-        """A simple test method for signature inspection."""
-        _LOGGER.debug("this_is_a_test_method called with foo: %s, bar: %s", foo, bar)
-        return True
-
     async def get_tts_audio(
         self, message: str, language: str, options: dict | None = None
     ) -> media_source.PlayMedia | tuple[str | None, bytes | None]:
         overall_start = time.monotonic()
         options = options or {}
+        # One consistent snapshot, even if the options change while this request runs
+        settings = self._settings
 
-        _LOGGER.debug(" -------------------------------------------")
-        _LOGGER.debug("|  Kokoro OpenAI TTS                        |")
-        _LOGGER.debug("|  https://github.com/davidtorcivia/kokoro_openai_tts |")
-        _LOGGER.debug(" -------------------------------------------")
-        _LOGGER.debug("get_tts_audio called with message (first 50 chars): '%s', lang: %s, options: %s", message[:50], language, options)
+        # Skip the banner and message slicing entirely unless debug logging is on
+        debug_enabled = _LOGGER.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            _LOGGER.debug(" -------------------------------------------")
+            _LOGGER.debug("|  Kokoro OpenAI TTS                        |")
+            _LOGGER.debug("|  https://github.com/davidtorcivia/kokoro_openai_tts |")
+            _LOGGER.debug(" -------------------------------------------")
+            _LOGGER.debug("get_tts_audio called with message (first 50 chars): '%s', lang: %s, options: %s", message[:50], language, options)
 
 
         try:
+            # The speech API limits input to 4096 characters (not bytes). Checked up front so
+            # streamed messages fail here instead of later inside the streaming view.
+            message_length = len(message)
+            if message_length > 4096:
+                _LOGGER.error("Message length %d exceeds maximum allowed 4096 characters.", message_length)
+                raise MaxLengthExceeded(f"Message length {message_length} exceeds maximum allowed 4096 characters.")
+
             # Check if media_source streaming is requested via options
             media_source_id_key_available = hasattr(media_source, 'TTS_SPEAK_OPTIONS_KEY_MEDIA_SOURCE_ID')
             should_stream_via_media_source = media_source_id_key_available and options.get(media_source.TTS_SPEAK_OPTIONS_KEY_MEDIA_SOURCE_ID)
 
             if should_stream_via_media_source:
-                _LOGGER.debug("Media source streaming requested for message: %s", message[:50])
-
-                message_hash = hashlib.sha256(message.encode("utf-8")).hexdigest()[:16]
-                from urllib.parse import quote
-                encoded_message = quote(message)
-
-                # Use self.entity_id which is now correctly initialized
-                stream_url_path = STREAMING_VIEW_URL.format(entity_id=self.entity_id, message_hash=message_hash)
-                # Ensure full URL is correctly formed using Home Assistant's get_url helper
-                full_stream_url = f"{get_url(self.hass, prefer_external=True)}{stream_url_path}?message={encoded_message}"
-                # Added prefer_external=True for broader player compatibility if HA is behind a proxy
+                if debug_enabled:
+                    _LOGGER.debug("Media source streaming requested for message: %s", message[:50])
+
+                # The hash covers everything that shapes the audio, so a URL always
+                # identifies the same audio and may be cached by the player
+                message_hash = _stream_hash(settings, message)
+                # The view looks the message up by hash, so it never travels in the URL
+                self._pending_messages[message_hash] = (message, time.monotonic() + PENDING_MESSAGE_TTL)
+                self._pending_messages.move_to_end(message_hash)
+                # Bound memory if many announcements are made without being fetched
+                while len(self._pending_messages) > PENDING_MESSAGE_MAX_ENTRIES:
+                    self._pending_messages.popitem(last=False)
+                async_call_later(
+                    self.hass, PENDING_MESSAGE_TTL, partial(self._async_expire_pending_message, message_hash)
+                )
+
+                full_stream_url = f"{self._stream_url_prefix}{message_hash}"
 
                 _LOGGER.debug("Generated streaming URL: %s", full_stream_url)
 
-                chime_enabled_option = self._config.options.get(CONF_CHIME_ENABLE, self._config.data.get(CONF_CHIME_ENABLE, False))
-                normalize_audio_option = self._config.options.get(CONF_NORMALIZE_AUDIO, self._config.data.get(CONF_NORMALIZE_AUDIO, False))
-                if chime_enabled_option or normalize_audio_option:
+                if settings.chime_enable or settings.normalize_audio:
                     _LOGGER.warning(
                         "Chime and/or normalization are enabled but will be BYPASSED for media_source streaming."
                     )
@@ -325,152 +1005,101 @@ class KokoroOpenAITTSEntity(TextToSpeechEntity):
                 return media_source.PlayMedia(url=full_stream_url, mime_type="audio/mpeg") # Assuming MP3 for OpenAI/Kokoro
 
             # --- Fallback to existing non-streaming logic (direct byte generation) ---
-            if len(message) > 4096: # Max length check for non-streaming
-                _LOGGER.error("Message length %d exceeds maximum allowed 4096 characters.", len(message))
-                raise MaxLengthExceeded(f"Message length {len(message)} exceeds maximum allowed 4096 characters for non-streaming TTS.")
+            # Resolved settings from the config entry (options override data)
+            effective_voice = settings.voice
+            current_speed = settings.speed
+            # Instructions can come from service call options, then config options, then config data
+            effective_instructions = options.get(CONF_INSTRUCTIONS, settings.instructions)
 
+            if debug_enabled:
+                _LOGGER.debug(
+                    "Non-streaming path. Effective settings: Voice: %s, Speed: %s, Instructions: %s",
+                    effective_voice, current_speed, "Present" if effective_instructions else "Not set"
+                )
 
-            # Retrieve current settings from config entry (options override data)
-            effective_voice = self._config.options.get(CONF_VOICE, self._config.data.get(CONF_VOICE))
-            current_speed = self._config.options.get(CONF_SPEED, self._config.data.get(CONF_SPEED, 1.0))
-            # Instructions can come from service call options, then config options, then config data
-            effective_instructions = options.get(
-                CONF_INSTRUCTIONS,
-                self._config.options.get(CONF_INSTRUCTIONS, self._config.data.get(CONF_INSTRUCTIONS))
-            )
+            # Determine if chime or normalization is needed from config (options override data)
+            chime_enabled = options.get(CONF_CHIME_ENABLE, settings.chime_enable)
+            normalize_audio = settings.normalize_audio
 
-            _LOGGER.debug(
-                "Non-streaming path. Effective settings: Voice: %s, Speed: %s, Instructions: %s",
-                effective_voice, current_speed, "Present" if effective_instructions else "Not set"
-            )
+            _LOGGER.debug("Chime enabled (non-streaming): %s", chime_enabled)
+            _LOGGER.debug("Normalization option (non-streaming): %s", normalize_audio)
 
             api_start = time.monotonic()
-            audio_chunks = []
+            audio_buffer = bytearray()
             # Call the engine's get_tts method (which should be async)
-            async for chunk in self._engine.get_tts(
+            audio_chunks = self._engine.get_tts(
                 text=message,
                 speed=current_speed,
                 voice=effective_voice,
                 instructions=effective_instructions
                 # language=language, # Pass language if engine supports it, OpenAI typically infers or uses voice setting
-            ):
-                if chunk: # Ensure chunk is not empty
-                    audio_chunks.append(chunk)
-            audio_content = b"".join(audio_chunks)
+            )
+            async def download() -> bytes | None:
+                if not normalize_audio:
+                    async for chunk in audio_chunks:
+                        audio_buffer.extend(chunk) # Grow one buffer in place instead of joining a list of chunks
+                    return None
+                # FFmpeg normalizes the audio while it is still downloading
+                processed, gain = await _async_normalize(
+                    audio_chunks, audio_buffer, self._normalize_gains.get(effective_voice)
+                )
+                # Stored under the voice measured, even if the options changed meanwhile
+                if gain is not None:
+                    self._normalize_gains[effective_voice] = gain
+                return processed
+
+            # Downloaded in a task of our own, which removing the entity cancels; a
+            # cancelled caller cancels it as well, as it is awaited directly
+            download_task = self.track_task(
+                self.hass.async_create_background_task(download(), f"{DOMAIN} download")
+            )
+            try:
+                normalized_audio = await download_task
+            except CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise # The caller itself was cancelled
+                # Only the download was, by removing the entity
+                _LOGGER.warning("TTS request aborted as the entity is being removed.")
+                return "mp3", None
+            audio_content = bytes(audio_buffer)
 
             if not audio_content:
                 _LOGGER.error("TTS API returned no audio content (non-streaming path).")
                 return "mp3", None # Consistent with HA docs for error cases
 
-            api_duration = (time.monotonic() - api_start) * 1000
-            _LOGGER.debug("TTS API call (non-streaming) completed in %.2f ms, received %d bytes", api_duration, len(audio_content))
-
-            # Determine if chime or normalization is needed from config (options override data)
-            chime_enabled = options.get(CONF_CHIME_ENABLE, self._config.options.get(CONF_CHIME_ENABLE, self._config.data.get(CONF_CHIME_ENABLE, False)))
-            normalize_audio = self._config.options.get(CONF_NORMALIZE_AUDIO, self._config.data.get(CONF_NORMALIZE_AUDIO, False))
-
-            _LOGGER.debug("Chime enabled (non-streaming): %s", chime_enabled)
-            _LOGGER.debug("Normalization option (non-streaming): %s", normalize_audio)
-
-            # FFmpeg processing for chime and/or normalization
-            if chime_enabled or normalize_audio:
-                # Write original TTS audio to a temporary file for FFmpeg input
-                with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tts_file:
-                    tts_file.write(audio_content)
-                    tts_input_path = tts_file.name
-                _LOGGER.debug("TTS audio for FFmpeg written to temp file: %s", tts_input_path)
-
-                processed_output_path = "" # Path for FFmpeg output
-
-                try:
-                    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as out_file:
-                        processed_output_path = out_file.name
-
-                    ffmpeg_cmd_list = ["ffmpeg", "-y"] # Base command
-
-                    if chime_enabled:
-                        chime_file_name = options.get(CONF_CHIME_SOUND, self._config.options.get(CONF_CHIME_SOUND, self._config.data.get(CONF_CHIME_SOUND, "threetone.mp3")))
-                        if not chime_file_name.lower().endswith('.mp3'):
-                            chime_file_name = f"{chime_file_name}.mp3"
-                        chime_file_path = os.path.join(os.path.dirname(__file__), "chime", chime_file_name)
-                        _LOGGER.debug("Using chime file: %s", chime_file_path)
-
-                        if not os.path.exists(chime_file_path):
-                            _LOGGER.error("Chime file not found at %s. Skipping chime.", chime_file_path)
-                            # If chime file is missing, proceed as if chime was disabled for this part
-                            chime_enabled = False # Effectively disable chime if file is missing
-                        else:
-                            ffmpeg_cmd_list.extend(["-i", chime_file_path]) # Input 0 (chime)
-
-                    ffmpeg_cmd_list.extend(["-i", tts_input_path]) # Input 1 (or 0 if no chime) (TTS)
-
-                    filter_complex_parts = []
-                    input_label_tts = "[1:a]" if chime_enabled else "[0:a]" # TTS audio stream label
-
-                    if normalize_audio:
-                        filter_complex_parts.append(f"{input_label_tts}loudnorm=I=-16:TP=-1:LRA=5[norm_tts]")
-                        input_label_tts = "[norm_tts]" # Next operation uses normalized TTS
-
-                    if chime_enabled: # If chime file was found and chime is still enabled
-                        # Prepend chime: [0:a] is chime, input_label_tts is (possibly normalized) TTS
-                        filter_complex_parts.append(f"[0:a]{input_label_tts}concat=n=2:v=0:a=1[out]")
-                    elif normalize_audio: # Only normalization, no chime
-                        filter_complex_parts.append(f"{input_label_tts}copy[out]") # Just pass through the normalized audio
-
-                    if filter_complex_parts: # If any filtering/concatenation was done
-                        ffmpeg_cmd_list.extend(["-filter_complex", ";".join(filter_complex_parts), "-map", "[out]"])
-                    # If neither chime nor normalization (but somehow ended up in this block),
-                    # ffmpeg will just copy the input tts_input_path to processed_output_path.
-                    # This case should ideally be handled by the outer if, but as a safeguard:
-                    elif not chime_enabled and not normalize_audio:
-                         _LOGGER.warning("FFmpeg processing block entered without chime or normalize. This is unexpected.")
-                         # Fallback to just copying the TTS audio if this path is somehow hit
-                         # This shouldn't happen if the outer 'if chime_enabled or normalize_audio:' is correct
-
-                    # Common output parameters
-                    ffmpeg_cmd_list.extend([
-                        "-ac", "1", "-ar", "24000", "-b:a", "128k",
-                        "-preset", "superfast", "-threads", "4", # Consider making threads configurable or auto-detected
-                        processed_output_path
-                    ])
-
-                    _LOGGER.debug("Executing FFmpeg command: %s", " ".join(ffmpeg_cmd_list))
-                    ffmpeg_start_time = time.monotonic()
-                    # Use partial for subprocess.run to ensure it's run in executor
-                    process = await self.hass.async_add_executor_job(
-                        partial(subprocess.run, ffmpeg_cmd_list, check=False, capture_output=True, text=True) # check=False to inspect errors
-                    )
-                    ffmpeg_duration = (time.monotonic() - ffmpeg_start_time) * 1000
-                    _LOGGER.debug("FFmpeg processing completed in %.2f ms. Return code: %d", ffmpeg_duration, process.returncode)
-
-                    if process.returncode != 0:
-                        _LOGGER.error("FFmpeg failed. Stdout: %s. Stderr: %s", process.stdout, process.stderr)
-                        # Fallback to original audio content if FFmpeg fails
-                        audio_content_to_return = audio_content
-                    else:
-                        with open(processed_output_path, "rb") as merged_file:
-                            audio_content_to_return = merged_file.read()
-                finally:
-                    # Cleanup temporary files
-                    if os.path.exists(tts_input_path):
-                        try:
-                            os.remove(tts_input_path)
-                        except Exception as e_remove:
-                            _LOGGER.warning("Could not remove temp TTS input file %s: %s", tts_input_path, e_remove)
-                    if processed_output_path and os.path.exists(processed_output_path):
-                        try:
-                            os.remove(processed_output_path)
-                        except Exception as e_remove:
-                             _LOGGER.warning("Could not remove temp FFmpeg output file %s: %s", processed_output_path, e_remove)
-
-                final_audio_content = audio_content_to_return # Use the processed audio (or original if FFmpeg failed)
-
-            else: # No chime, no normalization
-                _LOGGER.debug("Chime and normalization disabled; returning TTS MP3 audio directly.")
+            if debug_enabled:
+                _LOGGER.debug(
+                    "TTS API call (non-streaming) completed in %.2f ms, received %d bytes",
+                    (time.monotonic() - api_start) * 1000, len(audio_content),
+                )
+
+            chime_bytes = None
+            if chime_enabled:
+                chime_file_name = (
+                    _chime_file_name(options[CONF_CHIME_SOUND])
+                    if CONF_CHIME_SOUND in options
+                    else settings.chime_file
+                )
+                _LOGGER.debug("Using chime: %s", chime_file_name)
+                chime_bytes = await _async_get_chime(chime_file_name)
+
+            if normalized_audio is not None:
+                # Normalized audio is already in the chime's encoding
+                final_audio_content = (chime_bytes or b"") + normalized_audio
+            elif chime_bytes is not None:
+                ffmpeg_start_time = time.monotonic()
+                final_audio_content = await _async_prepend_chime(audio_content, chime_bytes)
+                if debug_enabled:
+                    _LOGGER.debug("Chime processing completed in %.2f ms", (time.monotonic() - ffmpeg_start_time) * 1000)
+            else: # No chime, and no (successful) normalization
+                _LOGGER.debug("Returning TTS MP3 audio directly.")
                 final_audio_content = audio_content
 
-            overall_duration = (time.monotonic() - overall_start) * 1000
-            _LOGGER.debug("Overall TTS processing (non-streaming) completed in %.2f ms. Returning %d bytes.", overall_duration, len(final_audio_content))
+            if debug_enabled:
+                _LOGGER.debug(
+                    "Overall TTS processing (non-streaming) completed in %.2f ms. Returning %d bytes.",
+                    (time.monotonic() - overall_start) * 1000, len(final_audio_content),
+                )
             return "mp3", final_audio_content # Return format and bytes
 
         except MaxLengthExceeded as mle:
@@ -480,9 +1109,6 @@ class KokoroOpenAITTSEntity(TextToSpeechEntity):
         except CancelledError:
             _LOGGER.info("TTS task was cancelled.")
             raise # Re-raise for Home Assistant to handle
-        except subprocess.CalledProcessError as spe:
-            _LOGGER.error("FFmpeg processing failed: %s. Stderr: %s", spe, spe.stderr)
-            return "mp3", None # Fallback: return None if FFmpeg fails
         except Exception as e:
             _LOGGER.exception("Unknown error during TTS generation in get_tts_audio: %s", e)
             return "mp3", None # Generic error fallback
@@ -490,27 +1116,75 @@ class KokoroOpenAITTSEntity(TextToSpeechEntity):
     async def async_get_tts_audio(
         self, message: str, language: str, options: dict | None = None,
     ) -> media_source.PlayMedia | tuple[str | None, bytes | None]:
-        """Proxy to the synchronous get_tts_audio method, executed in executor."""
-        # This method is called by Home Assistant and should be async.
-        # The actual audio generation, especially if it involves blocking I/O or CPU-bound tasks (like FFmpeg),
-        # should be run in an executor.
-        # However, `get_tts_audio` itself uses `hass.async_add_executor_job` for FFmpeg
-        # and its core API call to `self._engine.get_tts` is async.
-        # So, direct await should be fine.
-        try:
-            return await self.get_tts_audio(message, language, options=options)
-        except CancelledError:
-            _LOGGER.debug("async_get_tts_audio cancelled by client (re-raising).")
-            raise
-        except Exception as e:
-            _LOGGER.exception("Error caught in async_get_tts_audio wrapper: %s", e)
-            # Fallback if get_tts_audio itself doesn't return (None, None) or (ext, None) on error.
-            return "mp3", None
-
+        """Proxy to get_tts_audio, which is async as well.
+
+        get_tts_audio already turns errors into ("mp3", None) and re-raises
+        cancellation, so there is nothing left to catch here.
+        """
+        return await self.get_tts_audio(message, language, options=options)
+
+    async def async_stream_tts_audio(self, request: TTSAudioRequest) -> TTSAudioResponse:
+        """Stream the audio to Home Assistant as it arrives from the engine.
+
+        Playback can then start with the first chunk instead of after the full
+        download. Chime and normalization need the complete audio, and media_source
+        requests are answered with a URL, so those go through get_tts_audio.
+        """
+        options = request.options or {}
+        settings = self._settings
+        if (
+            options.get(CONF_CHIME_ENABLE, settings.chime_enable)
+            or settings.normalize_audio
+            or (
+                hasattr(media_source, 'TTS_SPEAK_OPTIONS_KEY_MEDIA_SOURCE_ID')
+                and options.get(media_source.TTS_SPEAK_OPTIONS_KEY_MEDIA_SOURCE_ID)
+            )
+        ):
+            return await super().async_stream_tts_audio(request)
+
+        async def data_gen():
+            message = "".join([chunk async for chunk in request.message_gen])
+            # Same limit as get_tts_audio, checked before any synthesis starts
+            message_length = len(message)
+            if message_length > 4096:
+                _LOGGER.error("Message length %d exceeds maximum allowed 4096 characters.", message_length)
+                raise MaxLengthExceeded(f"Message length {message_length} exceeds maximum allowed 4096 characters.")
+            audio_chunks = self._engine.get_tts(
+                text=message,
+                speed=settings.speed,
+                voice=settings.voice,
+                instructions=options.get(CONF_INSTRUCTIONS, settings.instructions),
+            )
+            # Download in a task of our own so removing the entity stops it, and hand
+            # the chunks over as they arrive
+            stream = _SharedStream()
+            task = self.track_task(self.hass.async_create_background_task(
+                _async_fill_stream(stream, audio_chunks), f"{DOMAIN} download"
+            ))
+            index = 0
+            try:
+                while (chunks := await stream.async_read(index)) is not None:
+                    index += len(chunks)
+                    for chunk in chunks:
+                        yield chunk
+            finally:
+                task.cancel() # Home Assistant stopped reading
+            if not index:
+                # Like get_tts_audio, don't pass an empty response off as audio
+                _LOGGER.error("TTS API returned no audio content (streaming path).")
+                raise HomeAssistantError("TTS engine returned no audio")
+
+        return TTSAudioResponse("mp3", data_gen())
 
     async def async_will_remove_from_hass(self) -> None:
         """Handle entity removal from Home Assistant."""
         _LOGGER.debug("KokoroOpenAITTSEntity is being removed. Closing engine session for entity: %s", self.entity_id)
+        self.hass.data.get(DOMAIN, {}).get("entities", {}).pop(self.entity_id, None)
+        # Stop downloads still running for this entity before closing their session
+        tasks = list(self._inflight_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
         if self._engine and hasattr(self._engine, 'close'): # Check if engine has close method
             await self._engine.close()
         _LOGGER.debug("Engine session closed for %s.", self.entity_id)